@@ -0,0 +1,378 @@
+"""
+热点接口HTTP基准：在本进程内启动多线程开发服务器，用并发客户端依次压测
+
+    cd cinema_back
+    python -m bench.endpoints --output bench/results.json --baseline bench/baseline.json
+
+场景依次执行：电影列表、场次座位、下单、支付（支付下单场景创建的订单）、管理员订单列表。
+每个场景输出 p50/p95/p99 延迟、吞吐量，以及从 /metrics 读取的每请求SQL语句数和SQL耗时。
+默认使用临时SQLite库；--database-uri 可指向本地MySQL的空库（会建表并写入数据，结束后不清理）。
+数据按序号生成、请求按序号分配场次和座位，同样的参数每次得到相同的数据和请求序列。
+
+客户端与服务端在同一进程内，绝对数值偏低，适合与同一台机器上保存的基线对比：
+--baseline 给出基线文件时，p95 变慢或吞吐下降超过 --tolerance、每请求SQL语句数增加、
+或出现基线中没有的错误都记为回归，退出码为1。更新基线：--output bench/baseline.json
+"""
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from importlib import metadata
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+
+from app import Movie, Order, Screening, SeatReservation, User, SOLD_STATUS, create_app, db, rebuild_seat_counts
+from bench.serialize import seed as seed_catalog
+from config import Config
+
+# 压测数据不配置影厅布局，座位按默认布局的序号依次分配到各场次
+SEATS_PER_ROW = Config.DEFAULT_HALL_COLS
+SEATS_PER_SCREENING = Config.DEFAULT_HALL_ROWS * Config.DEFAULT_HALL_COLS
+
+
+class Client:
+    """每个压测线程一个，复用keep-alive连接，服务端关闭连接时重新建立"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.conn = None
+
+    def request(self, method, path, body=None, token=None):
+        headers = {}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Scenario:
+    """
+    build(i) 返回第i个请求的 (method, path, body, token)；
+    on_success(i, data) 处理成功的响应（如记录新订单号），expect 为期望的状态码
+    """
+
+    def __init__(self, name, method, route, build, expect=200, on_success=None, warmup=True):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.build = build
+        self.expect = expect
+        self.on_success = on_success
+        self.warmup = warmup
+
+
+def seat_label(position):
+    """场次内第 position 个座位（从0开始按行填满）的 "行-列" 标识"""
+    return f'{position // SEATS_PER_ROW + 1}-{position % SEATS_PER_ROW + 1}'
+
+
+def seed(args):
+    """写入电影、场次、用户和历史订单（已支付），返回 (用户id列表, 管理员id, 场次id列表)"""
+    seed_catalog(args.movies, args.screenings)
+    created_at = datetime.now() - timedelta(days=1)
+    db.session.execute(db.insert(User), [{
+        'username': f'bench{i}', 'password': 'bench', 'email': f'bench{i}@example.com',
+        'is_admin': i == 0, 'created_at': created_at
+    } for i in range(args.users + 1)])
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+    admin_id, user_ids = user_ids[0], user_ids[1:]
+    screening_ids = [screening_id for (screening_id,) in db.session.query(Screening.id).order_by(Screening.id)]
+
+    orders, reservations = [], []
+    for i in range(args.orders):
+        # 订单轮流分配到各场次
+        screening_id, position = screening_ids[i % len(screening_ids)], i // len(screening_ids)
+        seat = seat_label(position)
+        row, col = (int(part) for part in seat.split('-'))
+        orders.append({'id': i + 1, 'user_id': user_ids[i % len(user_ids)], 'screening_id': screening_id,
+                       'seats': json.dumps([seat]), 'total_price': 40.0, 'status': SOLD_STATUS,
+                       'created_at': created_at})
+        reservations.append({'screening_id': screening_id, 'order_id': i + 1, 'seat_row': row, 'seat_col': col})
+    if orders:
+        db.session.execute(db.insert(Order), orders)
+        db.session.execute(db.insert(SeatReservation), reservations)
+    rebuild_seat_counts()
+    db.session.commit()
+    return user_ids, admin_id, screening_ids
+
+
+def build_scenarios(args, tokens, admin_token, screening_ids):
+    # 新订单同样轮流分配到各场次，座位从历史订单占用的座位之后开始
+    first_position = -(-args.orders // len(screening_ids))
+    created = {}
+
+    def create_order(i):
+        start = first_position + i // len(screening_ids) * args.seats_per_order
+        seats = [seat_label(start + k) for k in range(args.seats_per_order)]
+        body = {'screening_id': screening_ids[i % len(screening_ids)], 'seats': seats,
+                'total_price': 40.0 * len(seats)}
+        return 'POST', '/api/orders', body, tokens[i % len(tokens)]
+
+    def order_created(i, data):
+        created[i] = (json.loads(data)['order_id'], tokens[i % len(tokens)])
+
+    def pay_order(i):
+        order_id, token = created[i]
+        return 'POST', f'/api/users/current/orders/{order_id}/pay', None, token
+
+    return [
+        Scenario('movies', 'GET', '/api/movies', lambda i: ('GET', '/api/movies', None, None)),
+        Scenario('seats', 'GET', '/api/screenings/<int:screening_id>/seats',
+                 lambda i: ('GET', f'/api/screenings/{screening_ids[i % len(screening_ids)]}/seats', None, None)),
+        Scenario('create_order', 'POST', '/api/orders', create_order, expect=201,
+                 on_success=order_created, warmup=False),
+        Scenario('pay', 'POST', '/api/users/current/orders/<int:order_id>/pay', pay_order, warmup=False),
+        Scenario('orders', 'GET', '/api/orders', lambda i: ('GET', '/api/orders', None, admin_token)),
+    ]
+
+
+def scrape_metrics(client):
+    """读取 /metrics 中每个 (method, route) 的SQL语句数和SQL耗时累计值"""
+    status, data = client.request('GET', '/metrics')
+    if status != 200:
+        raise RuntimeError(f'/metrics 返回 {status}')
+    totals = {}
+    for line in data.decode().splitlines():
+        for metric, field in (('http_request_db_queries_sum', 'queries'),
+                              ('http_request_db_queries_count', 'requests'),
+                              ('http_request_db_seconds_total', 'db_seconds')):
+            if line.startswith(metric + '{'):
+                labels, value = line[len(metric) + 1:].rsplit('} ', 1)
+                labels = dict(pair.split('=', 1) for pair in labels.split(','))
+                key = (labels['method'].strip('"'), labels['route'].strip('"'))
+                totals.setdefault(key, {})[field] = float(value)
+    return totals
+
+
+def percentile(sorted_samples, fraction):
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def run_scenario(scenario, host, port, requests, concurrency, warmup):
+    """并发执行 requests 个请求，返回该场景的统计结果"""
+    if scenario.warmup and warmup:
+        client = Client(host, port)
+        for i in range(warmup):
+            client.request(*scenario.build(i))
+        client.close()
+
+    monitor = Client(host, port)
+    before = scrape_metrics(monitor).get((scenario.method, scenario.route), {})
+    counter = itertools.count()
+    lock = threading.Lock()
+    samples, errors = [], []
+
+    def worker():
+        client = Client(host, port)
+        local_samples = []
+        while True:
+            i = next(counter)
+            if i >= requests:
+                break
+            method, path, body, token = scenario.build(i)
+            started = time.perf_counter()
+            try:
+                status, data = client.request(method, path, body, token)
+            except (http.client.HTTPException, OSError) as e:
+                status, data = None, str(e).encode()
+            elapsed = time.perf_counter() - started
+            if status == scenario.expect:
+                local_samples.append(elapsed)
+                if scenario.on_success:
+                    scenario.on_success(i, data)
+            else:
+                with lock:
+                    errors.append(f'{status}: {data[:200].decode(errors="replace")}')
+        client.close()
+        with lock:
+            samples.extend(local_samples)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    after = scrape_metrics(monitor).get((scenario.method, scenario.route), {})
+    monitor.close()
+    counted = after.get('requests', 0) - before.get('requests', 0)
+    samples.sort()
+    result = {
+        'requests': requests,
+        'errors': len(errors),
+        'throughput_rps': round(len(samples) / wall, 1),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 2) if samples else None,
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 2) if samples else None,
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 2) if samples else None,
+        'mean_ms': round(statistics.fmean(samples) * 1000, 2) if samples else None,
+        'queries_per_request': round((after.get('queries', 0) - before.get('queries', 0)) / counted, 2)
+        if counted else None,
+        'db_ms_per_request': round((after.get('db_seconds', 0) - before.get('db_seconds', 0)) * 1000 / counted, 2)
+        if counted else None,
+    }
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """返回回归描述列表：p95变慢、吞吐下降超过 tolerance，SQL语句数增加，或新出现错误"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        if current['errors'] and not base['errors']:
+            regressions.append(f"{name}: {current['errors']} 个请求失败")
+        if current['p95_ms'] and base['p95_ms'] and current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if base['throughput_rps'] and current['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: 吞吐 {base['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current['queries_per_request'] is not None and base['queries_per_request'] is not None and \
+                current['queries_per_request'] > base['queries_per_request'] + 0.01:
+            regressions.append(f"{name}: 每请求SQL {base['queries_per_request']} -> "
+                               f"{current['queries_per_request']}")
+    return regressions
+
+
+def change(current, base, key):
+    if not base or not base.get(key) or current.get(key) is None:
+        return ''
+    return f'{(current[key] - base[key]) / base[key] * 100:+.0f}%'
+
+
+def report(results, baseline):
+    print(f"{'场景':<14}{'请求':>7}{'错误':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+          f"{'req/s':>9}{'SQL/请求':>10}{'SQL ms':>9}" + (f"{'p95对比':>9}{'吞吐对比':>9}" if baseline else ''))
+    for name, r in results['scenarios'].items():
+        line = (f"{name:<14}{r['requests']:>7}{r['errors']:>6}{r['p50_ms'] or '-':>10}{r['p95_ms'] or '-':>10}"
+                f"{r['p99_ms'] or '-':>10}{r['throughput_rps']:>9}{r['queries_per_request'] or '-':>10}"
+                f"{r['db_ms_per_request'] or '-':>9}")
+        if baseline:
+            base = baseline['scenarios'].get(name)
+            line += f"{change(r, base, 'p95_ms'):>9}{change(r, base, 'throughput_rps'):>9}"
+        print(line)
+        if r.get('first_error'):
+            print(f"  首个错误: {r['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-uri', help='默认使用临时SQLite库')
+    parser.add_argument('--requests', type=int, default=300, help='每个场景的请求数')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=20, help='只读场景计时前的预热请求数')
+    parser.add_argument('--movies', type=int, default=200)
+    parser.add_argument('--screenings', type=int, default=100)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--orders', type=int, default=300, help='预先写入的已支付订单数')
+    parser.add_argument('--seats-per-order', type=int, default=2)
+    parser.add_argument('--output', help='结果保存为JSON')
+    parser.add_argument('--baseline', help='与该JSON基线对比')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='允许的延迟/吞吐波动比例')
+    args = parser.parse_args()
+    seats_needed = -(-args.orders // args.screenings) + -(-args.requests // args.screenings) * args.seats_per_order
+    if seats_needed > SEATS_PER_SCREENING:
+        parser.error(f'每个场次需要 {seats_needed} 个座位，超过影厅的 {SEATS_PER_SCREENING} 个，请增加 --screenings')
+
+    path = None
+    uri = args.database_uri
+    if not uri:
+        # mkstemp 创建文件时即占用该路径，避免 mktemp 取名后被其他进程抢先创建
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        uri = f'sqlite:///{path}'
+    # 压测的是接口本身的开销，关闭下单限流
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'METRICS_TOKEN': None, 'RATE_LIMIT_ENABLED': False,
+                      'REQUEST_QUERY_BUDGET': None, 'REQUEST_TIME_BUDGET': None})
+    # 不输出每个请求的访问日志
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = None
+    try:
+        with app.app_context():
+            db.create_all()
+            if db.session.query(Movie.id).first() is not None:
+                sys.exit('数据库中已有数据，请使用空库')
+            user_ids, admin_id, screening_ids = seed(args)
+            tokens = [create_access_token(identity=str(user_id)) for user_id in user_ids]
+            admin_token = create_access_token(identity=str(admin_id), additional_claims={'is_admin': True})
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+        results = {
+            'meta': {
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'flask': metadata.version('flask'),
+                'sqlalchemy': metadata.version('sqlalchemy'),
+                'database': uri.split(':', 1)[0],
+                'args': {key: value for key, value in vars(args).items()
+                         if key not in ('database_uri', 'output', 'baseline', 'tolerance')},
+            },
+            'scenarios': {},
+        }
+        for scenario in build_scenarios(args, tokens, admin_token, screening_ids):
+            results['scenarios'][scenario.name] = run_scenario(
+                scenario, host, port, args.requests, args.concurrency, args.warmup)
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        report(results, baseline)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f'结果已保存到 {args.output}')
+        if baseline:
+            if baseline['meta']['args'] != results['meta']['args']:
+                print('注意: 基线使用的参数不同，对比结果仅供参考')
+            regressions = compare(results, baseline, args.tolerance)
+            for regression in regressions:
+                print(f'回归: {regression}')
+            if regressions:
+                sys.exit(1)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if path:
+            with app.app_context():
+                db.engine.dispose()
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+序列化微基准：对比原来手写dict + jsonify 的写法与 serializers 的片段缓存
+
+    cd cinema_back
+    python -m bench.serialize --movies 2000 --screenings 20000
+
+数据写入临时SQLite库，只计时序列化部分（行已加载到内存），分别给出
+原写法、片段缓存未命中（冷）、全部命中（热）三种情况下每次调用的耗时。
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from flask import jsonify
+
+from app import MOVIE_SUMMARY, SCREENING, Movie, Screening, create_app, db, fragment_cache
+
+
+def legacy_movies(movies):
+    # 与改动前 get_movies 相同的写法
+    return jsonify([{
+        'id': int(movie.id),
+        'title': str(movie.title),
+        'description': str(movie.description) if movie.description else '',
+        'director': str(movie.director) if movie.director else '',
+        'actors': str(movie.actors) if movie.actors else '',
+        'duration': int(movie.duration) if movie.duration else 0,
+        'release_date': movie.release_date.strftime('%Y-%m-%d') if movie.release_date else None,
+        'poster_url': str(movie.poster_url) if movie.poster_url else '',
+        'rating': float(movie.rating) if movie.rating else 0.0
+    } for movie in movies]).get_data()
+
+
+def legacy_screenings(screenings):
+    # 与改动前 get_all_screenings 相同的写法
+    return jsonify([{
+        'id': screening.id,
+        'movie_id': screening.movie_id,
+        'theater': screening.theater,
+        'hall': screening.hall,
+        'screening_time': screening.screening_time.strftime('%Y-%m-%d %H:%M'),
+        'price': screening.price
+    } for screening in screenings]).get_data()
+
+
+def timed(func, rows, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def cold(serializer):
+    def run(rows):
+        fragment_cache.clear()
+        return serializer.encode_many(rows)
+    return run
+
+
+def seed(movie_count, screening_count):
+    # updated_at 早于当前时间，使片段可以被缓存
+    updated_at = datetime.now() - timedelta(days=1)
+    db.session.execute(db.insert(Movie), [{
+        'title': f'电影 {i}', 'description': '剧情简介' * 20, 'director': f'导演 {i % 50}',
+        'actors': '演员甲, 演员乙, 演员丙', 'duration': 90 + i % 60,
+        'release_date': date(2000 + i % 25, 1 + i % 12, 1), 'poster_url': f'https://img.example.com/{i}.jpg',
+        'rating': (i % 50) / 10, 'created_at': updated_at, 'updated_at': updated_at
+    } for i in range(movie_count)])
+    db.session.execute(db.insert(Screening), [{
+        'movie_id': 1 + i % movie_count, 'theater': f'影城 {i % 20}', 'hall': f'{i % 8 + 1}号厅',
+        'screening_time': datetime(2030, 1, 1) + timedelta(hours=i), 'price': 30 + i % 40,
+        'created_at': updated_at, 'updated_at': updated_at
+    } for i in range(screening_count)])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movies', type=int, default=2000)
+    parser.add_argument('--screenings', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # mkstemp 创建文件时即占用该路径，避免 mktemp 取名后被其他进程抢先创建
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    try:
+        with app.app_context():
+            db.create_all()
+            seed(args.movies, args.screenings)
+            movies = Movie.query.all()
+            screenings = Screening.query.all()
+
+            print(f"{'接口':<22}{'行数':>8}{'原写法(ms)':>14}{'冷缓存(ms)':>14}{'热缓存(ms)':>14}{'加速':>8}")
+            for name, rows, legacy, serializer in (
+                ('get_movies', movies, legacy_movies, MOVIE_SUMMARY),
+                ('get_all_screenings', screenings, legacy_screenings, SCREENING)
+            ):
+                # 结果应与原写法解析后一致
+                assert len(legacy(rows[:10])) and serializer.encode_many(rows[:10])
+                legacy_ms = timed(legacy, rows, args.repeat)
+                cold_ms = timed(cold(serializer), rows, args.repeat)
+                serializer.encode_many(rows)
+                warm_ms = timed(serializer.encode_many, rows, args.repeat)
+                print(f"{name:<22}{len(rows):>8}{legacy_ms:>14.2f}{cold_ms:>14.2f}{warm_ms:>14.2f}"
+                      f"{legacy_ms / warm_ms:>7.1f}x")
+            print(f"片段缓存: {len(fragment_cache)} 条, {fragment_cache.size / 1024:.0f} KB")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
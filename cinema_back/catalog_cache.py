@@ -0,0 +1,326 @@
+"""
+目录类接口（电影、场次）的两级缓存
+
+- 第一级：进程内LRU，命中时不访问共享存储和数据库
+- 第二级：可替换的共享存储，默认 MemoryCatalogBackend（进程内，等同于只有一级），
+  FileCatalogBackend 把条目写到本机目录（需显式配置，仅当前用户可访问），同一台机器上的worker共享重建结果；
+  自定义存储（例如基于Redis）需实现 from_config(config) 类方法和 get/set/add/delete 方法，
+  通过 CATALOG_CACHE_BACKEND 配置为 "模块:类名"
+
+条目在 ttl 秒内为新鲜，之后到 stale_ttl 秒前仍可返回：过期条目由一个请求重建，其他请求继续使用旧数据。
+没有可用条目时同一个键只重建一次（进程内等待，跨进程通过共享存储中的锁等待），避免缓存过期时一起查询数据库。
+失效按命名空间进行：写入新的代号，旧代号下的条目不再被读取，之后自然过期。
+共享存储中的条目为 版本号+新鲜期限+可用期限 的定长头部加JSON，读取时不会执行任何代码。
+"""
+import hashlib
+import json
+import os
+import stat
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+# 返回给计数器的查询结果
+HIT, SHARED_HIT, STALE, MISS = 'hit', 'shared_hit', 'stale', 'miss'
+
+
+class MemoryCatalogBackend:
+    """进程内共享存储，最多保留 max_keys 个条目（按最近写入淘汰）"""
+
+    def __init__(self, max_keys=4096):
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['CATALOG_CACHE_SHARED_SIZE'])
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """键不存在（或已过期）时写入并返回True，用作跨请求的锁"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _set(self, key, value, ttl):
+        self._entries.pop(key, None)
+        self._entries[key] = (value, None if ttl is None else time.time() + ttl)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+
+class FileCatalogBackend:
+    """
+    本机目录中的共享存储，每个键一个文件（8字节过期时间 + 内容），写入时先写临时文件再原子替换
+    不跨机器共享；过期文件在写入时定期清理
+    """
+
+    PRUNE_EVERY = 1000
+    _header = struct.Struct('>d')
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._check_directory()
+        self._writes = 0
+
+    @classmethod
+    def from_config(cls, config):
+        if not config['CATALOG_CACHE_DIR']:
+            raise ValueError("使用 FileCatalogBackend 时必须配置 CATALOG_CACHE_DIR")
+        return cls(config['CATALOG_CACHE_DIR'])
+
+    def _check_directory(self):
+        """目录必须属于当前用户且其他用户不可写，否则他人可以伪造缓存条目"""
+        info = os.stat(self.directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+            raise ValueError(f"缓存目录 {self.directory} 必须是当前用户所有且其他用户不可写的目录")
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        if len(data) < self._header.size:
+            return None
+        expires_at, = self._header.unpack_from(data)
+        if expires_at and expires_at <= time.time():
+            return None
+        return data[self._header.size:]
+
+    def get(self, key):
+        return self._read(self._path(key))
+
+    def set(self, key, value, ttl=None):
+        path = self._path(key)
+        header = self._header.pack(time.time() + ttl if ttl is not None else 0)
+        temp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with os.fdopen(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as file:
+            file.write(header + value)
+        os.replace(temp, path)
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def add(self, key, value, ttl=None):
+        path = self._path(key)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                # 持有者异常退出后锁文件会残留，过期后删除重试
+                if self._read(path) is not None:
+                    return False
+                self.delete(key)
+                continue
+            with os.fdopen(fd, 'wb') as file:
+                file.write(self._header.pack(time.time() + ttl if ttl is not None else 0) + value)
+            return True
+        return False
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """删除已过期的文件"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith('.tmp') and self._read(path) is None:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class CatalogCache:
+    """
+    get_or_build(namespace, key, build) 返回缓存的值，没有可用条目时调用 build() 重建
+    build() 返回 None 表示结果不缓存（例如错误响应）；值需要能被JSON序列化（元组读回时为列表，字节串需先解码）
+    counter 为带 inc((namespace, 结果)) 方法的计数器，结果为 hit/shared_hit/stale/miss
+    """
+
+    ENTRY_VERSION = 1
+    _entry_header = struct.Struct('>Bdd')
+
+    def __init__(self, backend, local_size=256, ttl=30.0, stale_ttl=300.0, lock_timeout=10.0, counter=None):
+        self.backend = backend
+        self.local_size = local_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.counter = counter
+        self._local = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def generation(self, namespace):
+        value = self.backend.get(f'generation:{namespace}')
+        return value.decode('ascii') if value else '0'
+
+    def invalidate(self, *namespaces):
+        """使命名空间下的全部条目失效：其他进程在下次查询时读到新的代号"""
+        for namespace in namespaces:
+            self.backend.set(f'generation:{namespace}', f'{time.time_ns():x}'.encode('ascii'))
+            prefix = f'{namespace}:'
+            with self._lock:
+                for key in [key for key in self._local if key.startswith(prefix)]:
+                    del self._local[key]
+
+    def clear(self):
+        """清空本进程的条目（不影响共享存储）"""
+        with self._lock:
+            self._local.clear()
+
+    def get_or_build(self, namespace, key, build):
+        cache_key = f'{namespace}:{self.generation(namespace)}:{key}'
+        entry = self._local_get(cache_key)
+        result = HIT
+        if entry is None or entry[0] <= time.time():
+            shared = self._shared_get(cache_key)
+            if shared is not None and (entry is None or shared[0] > entry[0]):
+                entry = shared
+                self._local_set(cache_key, entry)
+                result = SHARED_HIT
+
+        if entry is not None and entry[0] > time.time():
+            self._count(namespace, result)
+            return entry[2]
+        if entry is not None and entry[1] > time.time():
+            # 过期但仍可用：由一个请求重建，其他请求返回旧数据
+            event = self._start_build(cache_key)
+            if event is None:
+                self._count(namespace, STALE)
+                return entry[2]
+            if not self.backend.add(f'lock:{cache_key}', b'1', self.lock_timeout):
+                self._finish_build(cache_key, event)
+                self._count(namespace, STALE)
+                return entry[2]
+            self._count(namespace, MISS)
+            return self._build(cache_key, build, event, locked=True)
+
+        self._count(namespace, MISS)
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            event = self._start_build(cache_key)
+            if event is not None:
+                break
+            # 本进程已有请求在重建同一个键，等待其结果
+            waiting = self._building.get(cache_key)
+            if waiting is not None:
+                waiting.wait(max(0, deadline - time.monotonic()))
+            entry = self._local_get(cache_key)
+            if entry is not None:
+                return entry[2]
+            if time.monotonic() >= deadline:
+                event = None
+                break
+        locked = event is not None and self.backend.add(f'lock:{cache_key}', b'1', self.lock_timeout)
+        if event is not None and not locked:
+            # 其他进程正在重建，等待结果写入共享存储，超时后自行重建
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                entry = self._shared_get(cache_key)
+                if entry is not None:
+                    self._local_set(cache_key, entry)
+                    self._finish_build(cache_key, event)
+                    return entry[2]
+        return self._build(cache_key, build, event, locked)
+
+    def _build(self, cache_key, build, event, locked):
+        try:
+            value = build()
+            if value is not None:
+                now = time.time()
+                data = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                # 本进程也使用JSON读回的值，保证命中哪一级缓存返回的类型都一样
+                entry = (now + self.ttl, now + self.stale_ttl, json.loads(data))
+                header = self._entry_header.pack(self.ENTRY_VERSION, entry[0], entry[1])
+                self.backend.set(cache_key, header + data, self.stale_ttl)
+                self._local_set(cache_key, entry)
+                return entry[2]
+            return value
+        finally:
+            if locked:
+                self.backend.delete(f'lock:{cache_key}')
+            if event is not None:
+                self._finish_build(cache_key, event)
+
+    def _start_build(self, cache_key):
+        """登记为该键的重建者并返回事件；已有重建者时返回 None"""
+        with self._lock:
+            if cache_key in self._building:
+                return None
+            event = self._building[cache_key] = threading.Event()
+            return event
+
+    def _finish_build(self, cache_key, event):
+        with self._lock:
+            self._building.pop(cache_key, None)
+        event.set()
+
+    def _local_get(self, cache_key):
+        with self._lock:
+            entry = self._local.get(cache_key)
+            if entry is not None:
+                if entry[1] <= time.time():
+                    del self._local[cache_key]
+                    return None
+                self._local.move_to_end(cache_key)
+            return entry
+
+    def _local_set(self, cache_key, entry):
+        with self._lock:
+            self._local[cache_key] = entry
+            self._local.move_to_end(cache_key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _shared_get(self, cache_key):
+        data = self.backend.get(cache_key)
+        if data is None or len(data) < self._entry_header.size:
+            return None
+        version, fresh_until, stale_until = self._entry_header.unpack_from(data)
+        if version != self.ENTRY_VERSION or stale_until <= time.time():
+            return None
+        try:
+            value = json.loads(data[self._entry_header.size:])
+        except ValueError:
+            return None
+        return fresh_until, stale_until, value
+
+    def _count(self, namespace, result):
+        if self.counter is not None:
+            self.counter.inc((namespace, result))
+
+    def __len__(self):
+        return len(self._local)
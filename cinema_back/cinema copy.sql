@@ -35,7 +35,8 @@ CREATE TABLE `movie` (
   `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
   KEY `idx_release_date` (`release_date`),
-  KEY `idx_rating` (`rating`)
+  KEY `idx_rating` (`rating`),
+  FULLTEXT KEY `ft_movie_search` (`title`, `director`, `actors`) WITH PARSER ngram
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 -- ----------------------------
@@ -126,6 +127,7 @@ CREATE TABLE `order` (
   KEY `idx_screening_id` (`screening_id`),
   KEY `idx_status` (`status`),
   KEY `idx_created_at` (`created_at`),
+  KEY `idx_status_created_at` (`status`, `created_at`),
   CONSTRAINT `fk_order_user` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `fk_order_screening` FOREIGN KEY (`screening_id`) REFERENCES `screening` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -140,4 +142,101 @@ INSERT INTO `order` VALUES
 (4, 4, 4, '["D7", "D8"]', 80.00, 'confirmed', NOW(), NOW()),
 (5, 2, 5, '["E9", "E10"]', 80.00, 'completed', NOW(), NOW());
 
+-- ----------------------------
+-- Table structure for seat_reservation
+-- 每个被订单占用的座位一行，唯一索引保证同一座位不会被重复预订
+-- 旧订单 seats 字段中的座位可通过 `flask migrate-seats` 迁移
+-- ----------------------------
+DROP TABLE IF EXISTS `seat_reservation`;
+CREATE TABLE `seat_reservation` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `screening_id` int NOT NULL,
+  `order_id` int NOT NULL,
+  `seat_row` int NOT NULL,
+  `seat_col` int NOT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_screening_seat` (`screening_id`, `seat_row`, `seat_col`),
+  KEY `ix_seat_reservation_order_id` (`order_id`),
+  CONSTRAINT `fk_seat_screening` FOREIGN KEY (`screening_id`) REFERENCES `screening` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
+  CONSTRAINT `fk_seat_order` FOREIGN KEY (`order_id`) REFERENCES `order` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- ----------------------------
+-- Records of seat_reservation
+-- ----------------------------
+INSERT INTO `seat_reservation` (`screening_id`, `order_id`, `seat_row`, `seat_col`) VALUES
+(1, 1, 1, 1), (1, 1, 1, 2),
+(3, 2, 2, 3), (3, 2, 2, 4),
+(2, 3, 3, 5), (2, 3, 3, 6),
+(4, 4, 4, 7), (4, 4, 4, 8),
+(5, 5, 5, 9), (5, 5, 5, 10);
+
+-- ----------------------------
+-- Table structure for sales_stat
+-- 按 销售日期/电影/影院 汇总的销售数据，由订单状态变化增量维护
+-- 已有数据可通过 `flask rebuild-stats` 重建
+-- ----------------------------
+DROP TABLE IF EXISTS `sales_stat`;
+CREATE TABLE `sales_stat` (
+  `stat_date` date NOT NULL,
+  `movie_id` int NOT NULL,
+  `theater` varchar(100) NOT NULL,
+  `tickets_sold` int NOT NULL DEFAULT 0,
+  `revenue` double NOT NULL DEFAULT 0,
+  `orders_count` int NOT NULL DEFAULT 0,
+  PRIMARY KEY (`stat_date`, `movie_id`, `theater`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- ----------------------------
+-- Records of sales_stat
+-- ----------------------------
+INSERT INTO `sales_stat` (`stat_date`, `movie_id`, `theater`, `tickets_sold`, `revenue`, `orders_count`)
+SELECT DATE(o.`created_at`), s.`movie_id`, s.`theater`, SUM(JSON_LENGTH(o.`seats`)), SUM(o.`total_price`), COUNT(*)
+FROM `order` o JOIN `screening` s ON s.`id` = o.`screening_id`
+WHERE o.`status` = 'confirmed'
+GROUP BY DATE(o.`created_at`), s.`movie_id`, s.`theater`;
+
+-- ----------------------------
+-- Table structure for screening_seat_count
+-- 每个场次已售和锁座中的座位数，由订单状态变化增量维护，场次列表据此返回余票
+-- 已有数据可通过 `flask rebuild-stats` 重建
+-- ----------------------------
+DROP TABLE IF EXISTS `screening_seat_count`;
+CREATE TABLE `screening_seat_count` (
+  `screening_id` int NOT NULL,
+  `seats_sold` int NOT NULL DEFAULT 0,
+  `seats_held` int NOT NULL DEFAULT 0,
+  `version` int NOT NULL DEFAULT 0,
+  PRIMARY KEY (`screening_id`),
+  CONSTRAINT `fk_seat_count_screening` FOREIGN KEY (`screening_id`) REFERENCES `screening` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- ----------------------------
+-- Records of screening_seat_count
+-- ----------------------------
+INSERT INTO `screening_seat_count` (`screening_id`, `seats_sold`, `seats_held`, `version`)
+SELECT r.`screening_id`, SUM(o.`status` <> 'pending'), SUM(o.`status` = 'pending'), 1
+FROM `seat_reservation` r JOIN `order` o ON o.`id` = r.`order_id`
+GROUP BY r.`screening_id`;
+
+-- ----------------------------
+-- Table structure for hall_layout
+-- 影厅座位布局，按 影院/影厅 名称与场次关联；没有记录的影厅使用默认的 8 排 x 10 列
+-- aisle_rows/aisle_cols：第 n-1 位为1表示第 n 排/列之后是过道
+-- disabled_seats：不可售座位位图，第 (行-1)*cols + (列-1) 位，小端字节序
+-- ----------------------------
+DROP TABLE IF EXISTS `hall_layout`;
+CREATE TABLE `hall_layout` (
+  `theater` varchar(100) NOT NULL,
+  `hall` varchar(50) NOT NULL,
+  `rows` int NOT NULL,
+  `cols` int NOT NULL,
+  `aisle_rows` int NOT NULL DEFAULT 0,
+  `aisle_cols` int NOT NULL DEFAULT 0,
+  `disabled_seats` blob NOT NULL,
+  `version` int NOT NULL DEFAULT 1,
+  `updated_at` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`theater`, `hall`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 SET FOREIGN_KEY_CHECKS = 1;
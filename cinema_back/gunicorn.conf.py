@@ -0,0 +1,44 @@
+"""
+gunicorn 生产配置：gunicorn -c gunicorn.conf.py wsgi:app
+
+主进程预加载应用（preload_app），worker 通过 fork 共享已导入的代码，
+单个worker内存更小、扩容时启动更快。fork 之后每个worker丢弃继承的连接池并启动自己的锁座清理线程。
+
+可用环境变量：
+  PORT                 监听端口，默认 5000
+  WEB_CONCURRENCY      worker 进程数，默认 CPU核数*2+1
+  GUNICORN_THREADS     每个 worker 的线程数，默认 4（SSE长连接会占用线程，见下）
+  GUNICORN_TIMEOUT     worker 无响应多少秒后重启，默认 60
+  CINEMA_*             应用配置，见 config.py；CINEMA_DB_POOL_SIZE 不应小于 GUNICORN_THREADS
+
+座位推送（SSE）：gthread worker 中每个打开的推送连接在断开前一直占用一个线程。
+每个worker最多保持 CINEMA_SEAT_STREAM_MAX_PER_WORKER 个推送连接，未设置时为线程数的一半（至少1个），
+其余线程始终可以处理下单、目录等普通请求；超出上限的订阅返回503，前端改为轮询座位接口。
+需要支持大量同时在线的选座页面时，增加 worker 数，或把推送接口交给异步worker（gevent 等）单独部署
+并设置 CINEMA_SEAT_STREAM_MAX_PER_WORKER=null。
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# 在预加载应用之前设置，create_app() 从环境变量读取
+os.environ.setdefault('CINEMA_SEAT_STREAM_MAX_PER_WORKER', str(max(1, threads // 2)))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # 把预加载阶段创建的对象移出GC跟踪，避免GC写入对象头导致写时复制的内存页被复制
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import dispose_engines, start_hold_sweeper
+
+    app = worker.app.wsgi()
+    dispose_engines(app)
+    start_hold_sweeper(app)
@@ -0,0 +1,105 @@
+"""
+影厅座位布局
+
+每个影厅的布局是一个不可变的 SeatMap：行列数、过道（行/列位图：第 n-1 位表示第 n 行/列之后是过道）
+和不可售座位位图（第 (row-1)*cols + (col-1) 位）。该影厅场次的 seat_cache.SeatBitmap 使用同样的 rows/cols，
+两个位图编号相同，客户端可以直接按位合并。
+布局表很小，SeatMapRegistry 在进程内保存全部布局的快照，过期或本进程修改布局后整体重新加载，
+校验座位时不需要查询数据库。
+"""
+import base64
+import threading
+import time
+
+
+def bit_numbers(mask):
+    """位图中为1的位对应的编号（从1开始）"""
+    numbers = []
+    while mask:
+        lowest = mask & -mask
+        numbers.append(lowest.bit_length())
+        mask ^= lowest
+    return numbers
+
+
+def pack_numbers(numbers):
+    """bit_numbers 的逆运算"""
+    mask = 0
+    for number in numbers:
+        mask |= 1 << (number - 1)
+    return mask
+
+
+class SeatMap:
+    __slots__ = ('rows', 'cols', 'aisle_rows', 'aisle_cols', 'disabled', 'version', 'capacity')
+
+    def __init__(self, rows, cols, aisle_rows=0, aisle_cols=0, disabled=0, version=0):
+        self.rows = rows
+        self.cols = cols
+        self.aisle_rows = aisle_rows
+        self.aisle_cols = aisle_cols
+        self.disabled = disabled
+        self.version = version
+        self.capacity = rows * cols - bin(disabled).count('1')
+
+    @classmethod
+    def from_bytes(cls, rows, cols, aisle_rows, aisle_cols, disabled, version):
+        return cls(rows, cols, aisle_rows, aisle_cols, int.from_bytes(disabled or b'', 'little'), version)
+
+    @classmethod
+    def from_seats(cls, rows, cols, aisle_rows=(), aisle_cols=(), disabled=(), version=0):
+        """由行列号列表构造；disabled 为 (row, col) 列表，超出范围时抛出 ValueError"""
+        mask = 0
+        for row, col in disabled:
+            if not (1 <= row <= rows and 1 <= col <= cols):
+                raise ValueError(f"不可售座位超出影厅范围: {row}-{col}")
+            mask |= 1 << ((row - 1) * cols + col - 1)
+        for number, limit, name in [(n, rows, '行') for n in aisle_rows] + [(n, cols, '列') for n in aisle_cols]:
+            if not 1 <= number < limit:
+                raise ValueError(f"过道位置无效: 第{number}{name}之后")
+        return cls(rows, cols, pack_numbers(aisle_rows), pack_numbers(aisle_cols), mask, version)
+
+    def is_seat(self, row, col):
+        """是否为可售座位（在影厅范围内且未被禁用）"""
+        return 1 <= row <= self.rows and 1 <= col <= self.cols and \
+            not self.disabled >> ((row - 1) * self.cols + col - 1) & 1
+
+    def disabled_bytes(self):
+        return self.disabled.to_bytes((self.rows * self.cols + 7) // 8, 'little')
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'cols': self.cols,
+            'aisle_rows': bit_numbers(self.aisle_rows),
+            'aisle_cols': bit_numbers(self.aisle_cols),
+            'disabled': base64.b64encode(self.disabled_bytes()).decode('ascii'),
+            'capacity': self.capacity,
+            'version': self.version
+        }
+
+
+class SeatMapRegistry:
+    """全部影厅布局的进程内快照，未配置布局的影厅使用 default"""
+
+    def __init__(self, default, ttl=60.0):
+        self.default = default
+        self.ttl = ttl
+        self._layouts = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, theater, hall, loader):
+        """loader() 返回 {(theater, hall): SeatMap}，快照过期时只由一个线程重新加载"""
+        layouts = self._layouts
+        if layouts is None or self._expires_at <= time.monotonic():
+            with self._lock:
+                if self._layouts is None or self._expires_at <= time.monotonic():
+                    self._layouts = loader()
+                    self._expires_at = time.monotonic() + self.ttl
+                layouts = self._layouts
+        return layouts.get((theater, hall), self.default)
+
+    def invalidate(self):
+        with self._lock:
+            self._layouts = None
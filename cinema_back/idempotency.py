@@ -0,0 +1,95 @@
+"""
+Idempotency-Key 的结果存储
+
+同一个键第一次请求时登记为“处理中”，完成后保存响应，之后的重复请求直接返回保存的响应；
+处理中的重复请求等待第一个请求结束。条目在完成后 ttl 秒过期，超过 capacity 时淘汰最久未使用的已完成条目。
+进程内存储，多worker部署时只能识别落到同一个worker上的重复请求。
+"""
+import threading
+import time
+from collections import OrderedDict
+
+RUN, REPLAY, MISMATCH, BUSY = 'run', 'replay', 'mismatch', 'busy'
+
+
+class _Entry:
+    __slots__ = ('fingerprint', 'response', 'expires_at')
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.response = None
+        self.expires_at = None
+
+
+class IdempotencyStore:
+    def __init__(self, capacity=10000, ttl=3600):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._condition = threading.Condition()
+
+    def acquire(self, key, fingerprint, timeout):
+        """
+        返回 (状态, 响应)：
+        RUN      当前请求负责执行，结束后必须调用 complete 或 abandon
+        REPLAY   已有保存的响应
+        MISMATCH 同一个键对应的请求内容不同
+        BUSY     等待 timeout 秒后第一个请求仍未结束
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    self._entries[key] = _Entry(fingerprint)
+                    self._evict()
+                    return RUN, None
+                if entry.fingerprint != fingerprint:
+                    return MISMATCH, None
+                if entry.response is not None:
+                    self._entries.move_to_end(key)
+                    return REPLAY, entry.response
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return BUSY, None
+                self._condition.wait(remaining)
+
+    def complete(self, key, response):
+        """保存响应并唤醒等待中的重复请求"""
+        with self._condition:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.response = response
+                entry.expires_at = time.monotonic() + self.ttl
+            self._condition.notify_all()
+
+    def abandon(self, key):
+        """请求失败（未保存结果）时删除登记，等待中的重复请求会重新执行"""
+        with self._condition:
+            self._entries.pop(key, None)
+            self._condition.notify_all()
+
+    def clear(self):
+        with self._condition:
+            self._entries.clear()
+            self._condition.notify_all()
+
+    def _evict(self):
+        # 只淘汰已完成的条目，处理中的条目数受并发请求数限制
+        overflow = len(self._entries) - self.capacity
+        if overflow <= 0:
+            return
+        evicted = []
+        for key, entry in self._entries.items():
+            if entry.response is not None:
+                evicted.append(key)
+                if len(evicted) >= overflow:
+                    break
+        for key in evicted:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,107 @@
+"""
+下单/支付的限流与准入控制
+
+- 令牌桶：每个键（用户、场次）一个桶，按 rate 个/秒补充，最多积累 burst 个，每个请求消耗一个；
+  一个请求涉及多个桶时，所有桶都有令牌才一起消耗，被拒绝的请求不消耗任何桶的令牌
+- 准入闸门：同时执行的请求数不超过 limit，多出的最多 queue_size 个排队等待，其余立即拒绝
+
+桶状态保存在可替换的存储中，默认 MemoryBucketStore（进程内，多worker部署时每个worker独立计数）。
+自定义存储（例如基于Redis）需实现 from_config(config) 类方法和 take(buckets) 方法（原子地检查并消耗），
+通过 RATE_LIMIT_BACKEND 配置为 "模块:类名"。
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBucketStore:
+    """进程内令牌桶存储，按最近使用顺序最多保留 max_keys 个桶（被淘汰的桶视为已满）"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['RATE_LIMIT_MAX_KEYS'])
+
+    def take(self, buckets):
+        """
+        buckets 为 [(键, rate, burst), ...]，返回每个桶需要等待的秒数；
+        全部为0时各取一个令牌，否则不消耗任何令牌
+        """
+        now = time.monotonic()
+        with self._lock:
+            states = []
+            for key, rate, burst in buckets:
+                tokens, updated = self._buckets.pop(key, (burst, now))
+                states.append((key, min(burst, tokens + (now - updated) * rate)))
+            waits = [0 if tokens >= 1 else (1 - tokens) / rate
+                     for (_, tokens), (_, rate, _) in zip(states, buckets)]
+            taken = 0 if any(waits) else 1
+            for key, tokens in states:
+                self._buckets[key] = (tokens - taken, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return waits
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RateLimiter:
+    def __init__(self, store):
+        self.store = store
+
+    def check(self, limits):
+        """
+        limits 为 [(名称, 键, rate, burst), ...]，rate 为空的项不限流；
+        全部放行返回 (None, 0)，否则返回第一个拒绝的 (名称, 需要等待的秒数)，被拒绝时不消耗令牌
+        """
+        limits = [limit for limit in limits if limit[2]]
+        if not limits:
+            return None, 0
+        waits = self.store.take([(key, rate, max(1, burst or 1)) for _, key, rate, burst in limits])
+        for (name, _, _, _), wait in zip(limits, waits):
+            if wait:
+                return name, wait
+        return None, 0
+
+
+class AdmissionGate:
+    """限制同时执行的请求数，超出时最多 queue_size 个请求排队等待"""
+
+    def __init__(self, limit, queue_size):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout):
+        """获得执行名额返回True；队列已满或等待超过 timeout 秒返回False"""
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + timeout
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
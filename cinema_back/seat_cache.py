@@ -0,0 +1,124 @@
+"""
+场次已售座位的进程内位图缓存
+
+每个场次的已售座位压缩为一个整数位图：第 (row-1)*cols + (col-1) 位表示 row 行 col 列，
+rows/cols 取自场次所在影厅的布局，与布局中不可售座位位图的编号相同。
+缓存按LRU淘汰，首次访问时从数据库加载，订单支付/取消时原地更新，删除场次时失效。
+"""
+import base64
+import threading
+import time
+from collections import OrderedDict
+
+
+class SeatBitmap:
+    """单个场次的座位位图，rows/cols 为影厅的排数和每排座位数，超出布局的旧数据会自动扩展"""
+
+    __slots__ = ('rows', 'cols', 'bits')
+
+    def __init__(self, positions=(), cols=10, rows=0):
+        self.rows = rows
+        self.cols = cols
+        self.bits = 0
+        for row, col in positions:
+            self.add(row, col)
+
+    def _grow(self, cols):
+        seats = list(self)
+        self.cols = cols
+        self.bits = 0
+        for row, col in seats:
+            self.bits |= 1 << ((row - 1) * cols + col - 1)
+
+    def add(self, row, col):
+        if col > self.cols:
+            self._grow(col)
+        self.rows = max(self.rows, row)
+        self.bits |= 1 << ((row - 1) * self.cols + col - 1)
+
+    def discard(self, row, col):
+        if col <= self.cols:
+            self.bits &= ~(1 << ((row - 1) * self.cols + col - 1))
+
+    def __contains__(self, position):
+        row, col = position
+        return col <= self.cols and bool(self.bits >> ((row - 1) * self.cols + col - 1) & 1)
+
+    def __iter__(self):
+        bits, index = self.bits, 0
+        while bits:
+            if bits & 1:
+                yield index // self.cols + 1, index % self.cols + 1
+            bits >>= 1
+            index += 1
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def to_bytes(self):
+        """按位序小端打包：第i位位于第 i//8 个字节的第 i%8 位"""
+        return self.bits.to_bytes((self.rows * self.cols + 7) // 8, 'little')
+
+    def to_base64(self):
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+
+class SeatBitmapCache:
+    """
+    线程安全的场次座位位图LRU缓存
+    ttl 用于限制多进程部署下其他worker写入造成的不一致时间
+    """
+
+    def __init__(self, capacity=1024, ttl=5.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次更新/失效都递增，用于丢弃加载期间已经过期的结果
+        self._generation = 0
+
+    def get(self, screening_id, loader):
+        """返回场次的位图，不存在或已过期时调用 loader(screening_id) 加载，返回 (座位列表, 排数, 每排座位数)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(screening_id)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(screening_id)
+                return entry[0]
+            generation = self._generation
+
+        positions, rows, cols = loader(screening_id)
+        bitmap = SeatBitmap(positions, cols, rows)
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[screening_id] = (bitmap, now + self.ttl)
+                self._entries.move_to_end(screening_id)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+        return bitmap
+
+    def update(self, screening_id, add=(), remove=()):
+        """订单提交后原地更新已缓存的位图，未缓存时不做处理"""
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(screening_id)
+            if not entry:
+                return
+            # 复制后替换，避免正在序列化旧位图的请求看到中间状态
+            bitmap = SeatBitmap(cols=entry[0].cols)
+            bitmap.rows, bitmap.bits = entry[0].rows, entry[0].bits
+            for row, col in remove:
+                bitmap.discard(row, col)
+            for row, col in add:
+                bitmap.add(row, col)
+            self._entries[screening_id] = (bitmap, entry[1])
+
+    def invalidate(self, screening_id=None):
+        """使单个场次（或全部）的缓存失效"""
+        with self._lock:
+            self._generation += 1
+            if screening_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(screening_id, None)
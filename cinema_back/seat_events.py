@@ -0,0 +1,115 @@
+"""
+场次座位状态变化的进程内发布/订阅中心，用于SSE推送
+
+每个场次维护一个单调递增的版本号和最近若干条增量事件。写入方发布一次，
+所有订阅者从内存中读取同一份事件，不需要为每个订阅者查询数据库。
+客户端带上最后收到的版本号即可续传；版本过旧（已不在历史中）时需要重新获取快照。
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class _Channel:
+    __slots__ = ('version', 'events', 'condition', 'subscribers', 'closed')
+
+    def __init__(self, history):
+        # 以微秒时间戳作为起始版本，进程重启后旧版本号自然落在历史之外
+        self.version = time.time_ns() // 1000
+        self.events = deque(maxlen=history)
+        self.condition = threading.Condition()
+        self.subscribers = 0
+        self.closed = False
+
+
+class SeatEventHub:
+    """线程安全的场次座位事件中心"""
+
+    def __init__(self, history=256, capacity=1024):
+        self.history = history
+        self.capacity = capacity
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, screening_id):
+        with self._lock:
+            channel = self._channels.get(screening_id)
+            if channel is None:
+                channel = self._channels[screening_id] = _Channel(self.history)
+                self._evict()
+            self._channels.move_to_end(screening_id)
+            return channel
+
+    def _evict(self):
+        # 只淘汰没有订阅者的场次，避免正在推送的连接丢失事件
+        for screening_id in list(self._channels):
+            if len(self._channels) <= self.capacity:
+                break
+            if not self._channels[screening_id].subscribers:
+                del self._channels[screening_id]
+
+    def current_version(self, screening_id):
+        return self._channel(screening_id).version
+
+    def can_resume(self, screening_id, version):
+        """客户端从 version 续传时，历史事件是否仍然完整"""
+        channel = self._channel(screening_id)
+        with channel.condition:
+            return self._events_after(channel, version) is not None
+
+    def publish(self, screening_id, seats, state):
+        """发布一组座位的新状态，返回该事件的版本号"""
+        channel = self._channel(screening_id)
+        with channel.condition:
+            channel.version += 1
+            channel.events.append((channel.version, {'state': state, 'seats': list(seats)}))
+            channel.condition.notify_all()
+            return channel.version
+
+    def close(self, screening_id):
+        """场次被删除时结束所有订阅"""
+        with self._lock:
+            channel = self._channels.pop(screening_id, None)
+        if channel:
+            with channel.condition:
+                channel.closed = True
+                channel.condition.notify_all()
+
+    def _events_after(self, channel, version):
+        if version > channel.version:
+            return None
+        if version == channel.version:
+            return []
+        if not channel.events or channel.events[0][0] > version + 1:
+            return None
+        return [event for event in channel.events if event[0] > version]
+
+    def listen(self, screening_id, version, timeout=15):
+        """
+        依次产出版本号大于 version 的事件 (版本号, 数据)
+        超时没有新事件时产出 None（用于发送心跳）；历史不足以续传时产出 ('reset', None) 并结束
+        """
+        channel = self._channel(screening_id)
+        with channel.condition:
+            channel.subscribers += 1
+        try:
+            while True:
+                with channel.condition:
+                    events = self._events_after(channel, version)
+                    if events == [] and not channel.closed:
+                        channel.condition.wait(timeout)
+                        events = self._events_after(channel, version)
+                    if channel.closed:
+                        return
+                if events is None:
+                    yield 'reset', None
+                    return
+                if not events:
+                    yield None
+                    continue
+                for event in events:
+                    yield event
+                version = events[-1][0]
+        finally:
+            with channel.condition:
+                channel.subscribers -= 1
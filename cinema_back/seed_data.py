@@ -0,0 +1,263 @@
+"""
+大规模模拟数据生成（flask seed 使用）
+
+按固定的随机种子生成电影、场次、用户和订单的行（dict），不访问数据库，由调用方分批写入。
+每类数据使用独立的随机数序列，同样的种子、起始日期和数量参数总是生成相同的数据。
+
+- 电影热度按排名呈长尾分布，热门电影排片更多，场次上座率也更高；晚场和周末的场次更热门
+- 每个场次按所在影厅的布局选座（未配置布局时为 8 排 x 10 列），不使用不可售座位；
+  订单 1~4 张票，优先选同一排的连座，中间排更受欢迎
+- 已放映场次的订单为已支付或已取消；未放映场次另有少量待支付订单
+- 已取消订单保留座位JSON但不占用座位；待支付订单模拟未支付的锁座，超时后会被清理线程取消
+"""
+import bisect
+import json
+import math
+import random
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from hall_layout import SeatMap
+
+# 未提供影厅布局时使用的布局
+DEFAULT_LAYOUT = SeatMap(8, 10)
+ORDER_SIZES = [1, 2, 3, 4]
+ORDER_SIZE_WEIGHTS = [30, 45, 15, 10]
+# 放映开始时间（小时）及相对热度
+SHOW_TIMES = [(10, 0.6), (13, 0.8), (16, 1.0), (19, 1.5), (21.5, 1.2)]
+# (状态, 权重)：已放映 / 未放映的场次
+PAST_STATUSES = [('confirmed', 85), ('cancelled', 15)]
+FUTURE_STATUSES = [('confirmed', 80), ('cancelled', 12), ('pending', 8)]
+# 自动计算天数时的目标平均上座率
+TARGET_OCCUPANCY = 0.5
+
+THEATER_BRANDS = ['万达影城', '星美国际影城', 'CGV影城', '博纳国际影城', '金逸影城', '大地影院', '横店电影城', '耀莱成龙影城']
+DISTRICTS = ['朝阳', '海淀', '东城', '西城', '丰台', '通州', '浦东', '徐汇', '天河', '南山', '武侯', '西湖']
+TITLE_PREFIXES = ['星际', '无限', '暗夜', '长安', '流浪', '深海', '疾速', '少年', '天空', '龙门', '迷雾', '沉默']
+TITLE_NOUNS = ['穿越', '追击', '之城', '往事', '行者', '守望', '迷踪', '风暴', '密码', '传说', '归途', '战记']
+SURNAMES = ['王', '李', '张', '刘', '陈', '杨', '赵', '黄', '周', '吴', '徐', '孙', '马', '朱', '胡', '郭']
+GIVEN_NAMES = ['伟', '芳', '娜', '敏', '静', '磊', '洋', '艳', '勇', '军', '杰', '娟', '涛', '明', '超', '霞']
+DESCRIPTIONS = ['一段跨越时空的冒险。', '关于成长与告别的故事。', '悬念迭起的犯罪追踪。', '笑中带泪的家庭喜剧。',
+                '震撼视听的科幻巨作。', '根据真实事件改编。', '尘封多年的秘密被揭开。', '一场改变命运的相遇。']
+POSTER_URL = 'https://img.example.com/posters/{}.jpg'
+
+
+def seat_label(position, cols):
+    return f'{position // cols + 1}-{position % cols + 1}'
+
+
+@lru_cache(maxsize=None)
+def row_weights(rows):
+    """中间几排更受欢迎，例如8排为 1,2,3,4,4,3,2,1"""
+    return tuple(min(row + 1, rows - row) for row in range(rows))
+
+
+def hall_names(halls):
+    return [f'{i + 1}号厅' for i in range(halls)]
+
+
+def theater_name(index):
+    """例如 万达影城(朝阳店)；品牌和区域组合用完后加编号"""
+    brand = THEATER_BRANDS[index % len(THEATER_BRANDS)]
+    district = DISTRICTS[index // len(THEATER_BRANDS) % len(DISTRICTS)]
+    branch = index // (len(THEATER_BRANDS) * len(DISTRICTS))
+    return f'{brand}({district}{branch + 1 if branch else ""}店)'
+
+
+def required_days(orders, capacities):
+    """按目标上座率估算容纳 orders 个订单所需的排片天数（至少7天），capacities 为每个影厅的可售座位数"""
+    mean_size = sum(s * w for s, w in zip(ORDER_SIZES, ORDER_SIZE_WEIGHTS)) / sum(ORDER_SIZE_WEIGHTS)
+    seats_per_day = sum(capacities) * len(SHOW_TIMES)
+    return max(7, math.ceil(orders * mean_size / (seats_per_day * TARGET_OCCUPANCY)))
+
+
+class SyntheticData:
+    """
+    start_date 为“今天”：场次从 start_date 前若干天排到之后最多14天，订单创建时间不晚于 start_date 零点
+    各 *_rows 方法返回生成器，id 从 first_id 开始连续分配（调用方需保证不与已有数据冲突）
+    layout(theater, hall) 返回影厅的 SeatMap，座位按其编号（第 (row-1)*cols + (col-1) 位）生成
+    """
+
+    def __init__(self, seed, start_date, movies, theaters, halls, days, users, layout=None):
+        self.seed = seed
+        self.now = datetime.combine(start_date, time())
+        self.movie_count = movies
+        self.theaters = [theater_name(i) for i in range(theaters)]
+        self.halls = hall_names(halls)
+        self.layout = layout or (lambda theater, hall: DEFAULT_LAYOUT)
+        self.days = days
+        self.future_days = min(14, max(1, days // 4))
+        self.user_count = users
+        # 电影热度：按随机排名的长尾分布
+        ranks = list(range(movies))
+        self.random('popularity').shuffle(ranks)
+        self.popularity = [1 / (rank + 1) ** 0.8 for rank in ranks]
+        # order_rows 需要的场次信息：(id, movie_id, theater, screening_time, price, 热度, 影厅布局)
+        self.screenings = []
+        self.stats = {}
+
+    def random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def movie_rows(self, first_id=1):
+        rng = self.random('movies')
+        titles = {}
+        for i in range(self.movie_count):
+            title = rng.choice(TITLE_PREFIXES) + rng.choice(TITLE_NOUNS)
+            titles[title] = titles.get(title, 0) + 1
+            director = rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES) + rng.choice(GIVEN_NAMES)
+            actors = ','.join(rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES) for _ in range(rng.randint(2, 4)))
+            release_date = (self.now - timedelta(days=rng.randint(-30, 3 * 365))).date()
+            created_at = self.now - timedelta(days=rng.randint(1, 365))
+            yield {
+                'id': first_id + i,
+                # 重名的电影作为续集编号
+                'title': title if titles[title] == 1 else f'{title}{titles[title]}',
+                'description': ''.join(rng.sample(DESCRIPTIONS, 2)),
+                'director': director,
+                'actors': actors,
+                'duration': max(80, min(200, int(rng.gauss(120, 20)))),
+                'release_date': release_date,
+                'poster_url': POSTER_URL.format(first_id + i),
+                'rating': round(max(1.0, min(5.0, rng.gauss(3.8, 0.6))), 1),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+
+    def screening_rows(self, first_id=1, first_movie_id=1):
+        rng = self.random('screenings')
+        movie_weights = list(accumulate(self.popularity))
+        first_day = self.now - timedelta(days=self.days - self.future_days)
+        screening_id = first_id
+        for day in range(self.days):
+            date = first_day + timedelta(days=day)
+            weekend = 1.3 if date.weekday() >= 5 else 1.0
+            for theater_index, theater in enumerate(self.theaters):
+                base_price = 35 + theater_index % 4 * 5
+                for hall in self.halls:
+                    layout = self.layout(theater, hall)
+                    for hour, heat in SHOW_TIMES:
+                        movie_index = bisect.bisect(movie_weights, rng.random() * movie_weights[-1])
+                        screening_time = date + timedelta(hours=hour, minutes=rng.choice((0, 10, 20, 30)))
+                        price = float(base_price + (10 if hour >= 19 else 0) + (5 if weekend > 1 else 0))
+                        created_at = min(self.now, screening_time - timedelta(days=rng.randint(7, 14)))
+                        self.screenings.append((screening_id, first_movie_id + movie_index, theater,
+                                                screening_time, price,
+                                                math.sqrt(self.popularity[movie_index]) * heat * weekend,
+                                                layout))
+                        yield {
+                            'id': screening_id,
+                            'movie_id': first_movie_id + movie_index,
+                            'theater': theater,
+                            'hall': hall,
+                            'screening_time': screening_time,
+                            'price': price,
+                            'created_at': created_at,
+                            'updated_at': created_at,
+                        }
+                        screening_id += 1
+
+    def user_rows(self, first_id=1):
+        rng = self.random('users')
+        for i in range(self.user_count):
+            created_at = self.now - timedelta(minutes=rng.randint(60, 2 * 365 * 24 * 60))
+            yield {
+                'id': first_id + i,
+                'username': f'seed_user{first_id + i}',
+                'password': 'user123',
+                'email': f'seed_user{first_id + i}@example.com',
+                'is_admin': False,
+                'created_at': created_at,
+            }
+
+    def order_rows(self, count, first_id=1, first_user_id=1):
+        """
+        生成 count 个订单，每次产出 (订单行, 座位占用行列表)；需先遍历完 screening_rows
+        已支付订单同时累加到 self.stats：{(日期, movie_id, theater): [票数, 金额, 订单数]}
+        座位不足时抛出 ValueError
+        """
+        rng = self.random('orders')
+        screenings = self.screenings
+        cumulative = list(accumulate(screening[5] for screening in screenings))
+        # 不可售座位视为已占用
+        occupied = [screening[6].disabled for screening in screenings]
+        # 活跃用户下单更多
+        user_weights = list(accumulate(1 / (i + 1) ** 0.5 for i in range(self.user_count)))
+        for order_id in range(first_id, first_id + count):
+            size = rng.choices(ORDER_SIZES, ORDER_SIZE_WEIGHTS)[0]
+            index = mask = None
+            for _ in range(20):
+                index = bisect.bisect(cumulative, rng.random() * cumulative[-1])
+                mask = pick_seats(rng, occupied[index], size, screenings[index][6])
+                if mask is not None:
+                    break
+            else:
+                # 热门场次已满，从随机位置顺序查找有空座的场次
+                start = rng.randrange(len(screenings))
+                for offset in range(len(screenings)):
+                    index = (start + offset) % len(screenings)
+                    mask = pick_seats(rng, occupied[index], size, screenings[index][6])
+                    if mask is not None:
+                        break
+                else:
+                    raise ValueError(f'场次座位不足，已生成 {order_id - first_id} 个订单，请增加 --days')
+
+            screening_id, movie_id, theater, screening_time, price, _, layout = screenings[index]
+            future = screening_time > self.now
+            statuses, weights = zip(*(FUTURE_STATUSES if future else PAST_STATUSES))
+            status = rng.choices(statuses, weights)[0]
+            latest = min(self.now, screening_time - timedelta(minutes=10))
+            created_at = latest - timedelta(minutes=rng.randint(0, 7 * 24 * 60))
+            if status == 'pending':
+                created_at = self.now - timedelta(minutes=rng.randint(1, 30))
+            positions = mask_positions(mask)
+            user_id = first_user_id + bisect.bisect(user_weights, rng.random() * user_weights[-1])
+
+            reservations = []
+            if status != 'cancelled':
+                occupied[index] |= mask
+                reservations = [{'screening_id': screening_id, 'order_id': order_id,
+                                 'seat_row': p // layout.cols + 1, 'seat_col': p % layout.cols + 1} for p in positions]
+            if status == 'confirmed':
+                stat = self.stats.setdefault((created_at.date(), movie_id, theater), [0, 0.0, 0])
+                stat[0] += size
+                stat[1] += price * size
+                stat[2] += 1
+            yield {
+                'id': order_id,
+                'user_id': user_id,
+                'screening_id': screening_id,
+                'seats': json.dumps([seat_label(p, layout.cols) for p in positions]),
+                'total_price': price * size,
+                'status': status,
+                'created_at': created_at,
+            }, reservations
+
+
+def mask_positions(mask):
+    """位图中为1的座位序号（从小到大）"""
+    positions = []
+    while mask:
+        lowest = mask & -mask
+        positions.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return positions
+
+
+def pick_seats(rng, occupied, size, layout):
+    """在影厅 layout 的座位位图 occupied 中选 size 个空座，返回新座位的位图；优先同一排连座，空座不足时返回 None"""
+    rows, cols = layout.rows, layout.cols
+    for _ in range(4 if size <= cols else 0):
+        row = rng.choices(range(rows), row_weights(rows))[0]
+        mask = ((1 << size) - 1) << (row * cols + rng.randrange(cols - size + 1))
+        if not occupied & mask:
+            return mask
+    free = [i for i in range(rows * cols) if not occupied >> i & 1]
+    if len(free) < size:
+        return None
+    mask = 0
+    for position in rng.sample(free, size):
+        mask |= 1 << position
+    return mask
+
@@ -0,0 +1,179 @@
+"""
+统一的JSON序列化
+
+每种响应结构用 RowSerializer 定义一次字段和转换函数，编码时优先使用 orjson（已安装时），
+否则使用紧凑格式的标准库 json。带 updated_at 的行按 (名称, id, updated_at) 缓存编码后的
+JSON片段，列表接口直接拼接片段，同一行不会被重复序列化；缓存按字节数上限做LRU淘汰。
+"""
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时退回标准库
+    orjson = None
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps(obj):
+    """编码为UTF-8字节串，只支持JSON原生类型（日期需事先格式化为字符串）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _encoder.encode(obj).encode('utf-8')
+
+
+def splice(body, fragments):
+    """把已编码的片段作为额外的键拼接到一个JSON对象（字节串）中"""
+    if not fragments:
+        return body
+    extra = b','.join([dumps(key) + b':' + fragment for key, fragment in fragments.items()])
+    return body[:-1] + (b',' if len(body) > 2 else b'') + extra + b'}'
+
+
+def dumps_with(obj, **fragments):
+    """编码 obj，并拼接已编码的片段，例如 dumps_with({'total': 10}, items=rows_json)"""
+    return splice(dumps(obj), fragments)
+
+
+class FragmentCache:
+    """线程安全的JSON片段LRU缓存，按片段总字节数限制内存"""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def get_many(self, keys):
+        """批量查询，只加一次锁；未命中的位置为 None"""
+        entries = self._entries
+        with self._lock:
+            fragments = [entries.get(key) for key in keys]
+            for key, fragment in zip(keys, fragments):
+                if fragment is not None:
+                    entries.move_to_end(key)
+            hits = len(fragments) - fragments.count(None)
+            self.hits += hits
+            self.misses += len(fragments) - hits
+        return fragments
+
+    def set(self, key, fragment):
+        self.set_many([(key, fragment)])
+
+    def set_many(self, items):
+        entries = self._entries
+        with self._lock:
+            for key, fragment in items:
+                if len(fragment) > self.max_bytes:
+                    continue
+                previous = entries.pop(key, None)
+                if previous is not None:
+                    self.size -= len(previous)
+                entries[key] = fragment
+                self.size += len(fragment)
+            while self.size > self.max_bytes:
+                _, evicted = entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RowSerializer:
+    """
+    fields 为 [(键名, 取值函数)]，取值函数接收一行（ORM对象或结果行）返回JSON原生类型
+    cache 不为空时按 (name, id, updated_at) 缓存片段；没有 updated_at 的行不缓存
+    """
+
+    # 数据库时间戳可能只精确到秒，同一秒内的两次修改 updated_at 相同，
+    # 因此刚修改过的行暂不缓存，避免缓存住同一秒内被再次修改前的内容
+    settle = timedelta(seconds=2)
+
+    def __init__(self, name, fields, cache=None):
+        self.name = name
+        self.fields = fields
+        self.cache = cache
+        self.keys = [key for key, _ in fields]
+        self._projections = {}
+
+    def only(self, keys):
+        """
+        返回只包含 keys 中字段的序列化器（按原字段顺序），用于 fields= 稀疏字段集
+        投影使用独立的缓存名，不会与完整片段混用；keys 含未知字段时抛出 ValueError
+        """
+        unknown = set(keys) - set(self.keys)
+        if unknown:
+            raise ValueError(f"未知字段: {', '.join(sorted(unknown))}")
+        selected = tuple(key for key in self.keys if key in keys)
+        projection = self._projections.get(selected)
+        if projection is None:
+            projection = RowSerializer(f"{self.name}[{','.join(selected)}]",
+                                       [field for field in self.fields if field[0] in selected], self.cache)
+            # 字段组合由请求决定，限制保存的投影数量
+            if len(self._projections) < 64:
+                self._projections[selected] = projection
+        return projection
+
+    def to_dict(self, row):
+        return {key: getter(row) for key, getter in self.fields}
+
+    def encode(self, row):
+        """返回一行的JSON片段（字节串）"""
+        version = getattr(row, 'updated_at', None) if self.cache is not None else None
+        if version is None or version > datetime.now() - self.settle:
+            return dumps(self.to_dict(row))
+        key = (self.name, row.id, version)
+        fragment = self.cache.get(key)
+        if fragment is None:
+            fragment = dumps(self.to_dict(row))
+            self.cache.set(key, fragment)
+        return fragment
+
+    def encode_with(self, row, **fragments):
+        """返回一行的JSON片段，并拼接嵌套对象的片段"""
+        return splice(self.encode(row), fragments)
+
+    def encode_many(self, rows, extras=None):
+        """
+        返回多行组成的JSON数组（字节串），整批只查询和写入缓存各一次
+        extras 为与 rows 等长的字典列表，拼接到对应行的片段之后（用于不缓存的实时字段）
+        """
+        if self.cache is None:
+            return dumps([dict(self.to_dict(row), **extra) for row, extra in zip(rows, extras)] if extras
+                         else [self.to_dict(row) for row in rows])
+        threshold = datetime.now() - self.settle
+        keys = [(self.name, row.id, row.updated_at) for row in rows]
+        fragments = self.cache.get_many(keys)
+        missed = []
+        for index, fragment in enumerate(fragments):
+            if fragment is None:
+                fragments[index] = fragment = dumps(self.to_dict(rows[index]))
+                version = keys[index][2]
+                if version is not None and version <= threshold:
+                    missed.append((keys[index], fragment))
+        if missed:
+            self.cache.set_many(missed)
+        if extras:
+            fragments = [splice(fragment, {key: dumps(value) for key, value in extra.items()})
+                         for fragment, extra in zip(fragments, extras)]
+        return b'[' + b','.join(fragments) + b']'
@@ -0,0 +1,73 @@
+"""
+测试公共夹具：每个测试使用一个新的SQLite数据库文件，并重置进程内缓存
+
+运行：在 cinema_back 目录下执行 python -m pytest tests
+"""
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as cinema  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """返回创建SQLite应用并建表的函数，每次调用使用新的数据库文件；默认关闭限流以免测试请求被拒绝，关键字参数覆盖配置"""
+    databases = iter(range(1000))
+    
+    def make(**config):
+        options = dict(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / f'cinema{next(databases)}.db'}",
+                       JWT_SECRET_KEY='test-secret-key-with-at-least-32-bytes', RATE_LIMIT_ENABLED=False, TESTING=True)
+        options.update(config)
+        application = cinema.create_app(options)
+        with application.app_context():
+            cinema.db.create_all()
+        return application
+    return make
+
+
+def add_user(username, is_admin=False):
+    user = cinema.User(username=username, password=username, email=f'{username}@example.com', is_admin=is_admin)
+    cinema.db.session.add(user)
+    cinema.db.session.commit()
+    return user
+
+
+def add_screening(theater='万达影城', hall='1号厅', screening_time=datetime(2030, 1, 1, 10), price=40.0):
+    movie = cinema.Movie(title='测试电影', director='导演', actors='演员', duration=100,
+                         release_date=date(2020, 1, 1), poster_url='poster.jpg', rating=4.5)
+    cinema.db.session.add(movie)
+    cinema.db.session.flush()
+    screening = cinema.Screening(movie_id=movie.id, theater=theater, hall=hall,
+                                 screening_time=screening_time, price=price)
+    cinema.db.session.add(screening)
+    cinema.db.session.commit()
+    return screening
+
+
+def auth_headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+@contextmanager
+def count_queries(application):
+    """统计代码块中执行的SQL语句数：with count_queries(app) as queries: ...; len(queries)"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        
+    with application.app_context():
+        engine = cinema.db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,59 @@
+"""下单限流：用户桶、场次桶和排队闸门超限时返回429和Retry-After，被拒绝的请求不消耗其他桶的令牌"""
+from conftest import add_screening, add_user, auth_headers, cinema
+
+LIMITS = dict(RATE_LIMIT_ENABLED=True, RATE_LIMIT_USER_RATE=None, RATE_LIMIT_SCREENING_RATE=None,
+              BOOKING_CONCURRENCY=None)
+
+
+def book(client, headers, screening_id, seat):
+    return client.post('/api/orders', headers=headers, json={
+        'screening_id': screening_id, 'seats': [seat], 'total_price': 40
+    })
+
+
+def test_user_bucket_rejects_with_retry_after(make_app):
+    application = make_app(**dict(LIMITS, RATE_LIMIT_USER_RATE=0.1, RATE_LIMIT_USER_BURST=1))
+    with application.app_context():
+        screening_id = add_screening().id
+        headers = auth_headers(add_user('buyer'))
+    client = application.test_client()
+
+    assert book(client, headers, screening_id, '1-1').status_code == 201
+    response = book(client, headers, screening_id, '1-2')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '10'
+    assert response.json['retry_after'] == 10
+
+
+def test_screening_bucket_rejects_without_taking_user_token(make_app):
+    application = make_app(**dict(LIMITS, RATE_LIMIT_USER_RATE=0.1, RATE_LIMIT_USER_BURST=1,
+                                  RATE_LIMIT_SCREENING_RATE=0.5, RATE_LIMIT_SCREENING_BURST=1))
+    with application.app_context():
+        busy_id, quiet_id = add_screening().id, add_screening(hall='2号厅').id
+        first, second = auth_headers(add_user('first')), auth_headers(add_user('second'))
+    client = application.test_client()
+
+    assert book(client, first, busy_id, '1-1').status_code == 201
+    response = book(client, second, busy_id, '1-2')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '2'
+    # 被场次桶拒绝的请求没有消耗用户桶，换一个场次仍可下单
+    assert book(client, second, quiet_id, '1-1').status_code == 201
+
+
+def test_full_queue_rejects_with_retry_after(make_app):
+    application = make_app(**dict(LIMITS, BOOKING_CONCURRENCY=1, BOOKING_QUEUE_SIZE=0, BOOKING_QUEUE_TIMEOUT=3))
+    with application.app_context():
+        screening_id = add_screening().id
+        headers = auth_headers(add_user('buyer'))
+    client = application.test_client()
+
+    # 占住唯一的执行名额，队列长度为0，下一个请求立即被拒绝
+    assert cinema.booking_gate.acquire(0)
+    try:
+        response = book(client, headers, screening_id, '1-1')
+    finally:
+        cinema.booking_gate.release()
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+    assert book(client, headers, screening_id, '1-1').status_code == 201
@@ -0,0 +1,40 @@
+"""并发抢同一批座位：每个座位只有一个订单成功，其余请求返回409"""
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import add_screening, add_user, auth_headers, cinema
+
+WORKERS = 8
+
+
+def test_concurrent_bookings_never_double_book(make_app):
+    application = make_app(BOOKING_CONCURRENCY=None)
+    with application.app_context():
+        screening_id = add_screening().id
+        headers = [auth_headers(add_user(f'user{i}')) for i in range(WORKERS)]
+        layout = cinema.hall_layout('万达影城', '1号厅')
+    seats = [f'{row}-{col}' for row in range(1, layout.rows + 1) for col in range(1, layout.cols + 1)]
+    
+    def book_all(worker):
+        # 每个线程按不同顺序尝试预订全部座位，直到影厅售满
+        client = application.test_client()
+        order = random.Random(worker).sample(seats, len(seats))
+        return [(seat, client.post('/api/orders', headers=headers[worker], json={
+            'screening_id': screening_id, 'seats': [seat], 'total_price': 40
+        }).status_code) for seat in order]
+        
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = [result for worker in pool.map(book_all, range(WORKERS)) for result in worker]
+        
+    statuses = Counter(status for _, status in results)
+    assert set(statuses) == {201, 409}
+    winners = Counter(seat for seat, status in results if status == 201)
+    assert winners == Counter(seats)
+    assert statuses[409] == len(seats) * (WORKERS - 1)
+    
+    with application.app_context():
+        reserved = Counter(cinema.db.session.query(cinema.SeatReservation.seat_row, cinema.SeatReservation.seat_col)
+                           .filter_by(screening_id=screening_id).all())
+    assert len(reserved) == len(seats)
+    assert set(reserved.values()) == {1}
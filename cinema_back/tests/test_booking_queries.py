@@ -0,0 +1,32 @@
+"""下单的SQL语句数不随场次已售座位数增长：空场次和几乎售满的场次上预订一个座位的开销相同"""
+from conftest import add_screening, add_user, auth_headers, cinema, count_queries
+
+
+def book_last_seat_queries(make_app, sold):
+    """先由另一个用户买下 sold 个座位，再统计预订最后一个座位执行的SQL语句数"""
+    application = make_app(BOOKING_CONCURRENCY=None)
+    with application.app_context():
+        screening_id = add_screening().id
+        layout = cinema.hall_layout('万达影城', '1号厅')
+        other, buyer = auth_headers(add_user('other')), auth_headers(add_user('buyer'))
+    seats = [f'{row}-{col}' for row in range(1, layout.rows + 1) for col in range(1, layout.cols + 1)]
+    client = application.test_client()
+    if sold:
+        assert client.post('/api/orders', headers=other, json={
+            'screening_id': screening_id, 'seats': seats[:sold], 'total_price': 40 * sold
+        }).status_code == 201
+    # 先请求一次，使身份缓存等进程内缓存处于相同状态
+    client.get('/api/users/current/orders', headers=buyer)
+    with count_queries(application) as queries:
+        response = client.post('/api/orders', headers=buyer, json={
+            'screening_id': screening_id, 'seats': [seats[-1]], 'total_price': 40
+        })
+    assert response.status_code == 201
+    return len(queries), len(seats)
+
+
+def test_booking_query_count_does_not_grow_with_sold_seats(make_app):
+    empty_queries, capacity = book_last_seat_queries(make_app, 0)
+    full_queries, _ = book_last_seat_queries(make_app, capacity - 1)
+
+    assert empty_queries == full_queries
@@ -0,0 +1,44 @@
+"""目录接口的304由轻量验证查询判断，不读取缓存也不序列化响应体；余票变化会使场次列表的ETag失效"""
+from conftest import add_screening, add_user, auth_headers, count_queries
+
+
+def test_movie_list_revalidates_with_one_query(make_app):
+    application = make_app()
+    with application.app_context():
+        add_screening()
+    client = application.test_client()
+
+    response = client.get('/api/movies')
+    assert response.status_code == 200
+    assert response.headers['Last-Modified']
+
+    with count_queries(application) as queries:
+        not_modified = client.get('/api/movies', headers={'If-None-Match': response.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == response.headers['ETag']
+    assert len(queries) == 1
+
+    since = client.get('/api/movies', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert since.status_code == 304
+
+
+def test_screening_list_etag_follows_seat_counts(make_app):
+    application = make_app(BOOKING_CONCURRENCY=None)
+    with application.app_context():
+        screening = add_screening()
+        screening_id, movie_id = screening.id, screening.movie_id
+        headers = auth_headers(add_user('buyer'))
+    client = application.test_client()
+    path = f'/api/screenings/{movie_id}'
+
+    etag = client.get(path).headers['ETag']
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+    assert client.post('/api/orders', headers=headers, json={
+        'screening_id': screening_id, 'seats': ['1-1'], 'total_price': 40
+    }).status_code == 201
+
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json[0]['seats_available'] == 79
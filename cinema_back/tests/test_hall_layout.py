@@ -0,0 +1,72 @@
+"""影厅布局的不可售座位位图与场次座位位图（format=bitmap）使用相同的编号；场次换影厅时按新布局检查已占用的座位"""
+import base64
+
+from conftest import add_screening, add_user, auth_headers
+
+
+def decode(mask, rows, cols):
+    """把base64位图解码为 {(行, 列)}"""
+    bits = int.from_bytes(base64.b64decode(mask), 'little')
+    return {(index // cols + 1, index % cols + 1) for index in range(rows * cols) if bits >> index & 1}
+
+
+def test_layout_and_seat_bitmap_share_numbering(make_app):
+    application = make_app()
+    with application.app_context():
+        screening_id = add_screening(theater='小影院', hall='2号厅').id
+        admin = auth_headers(add_user('admin', is_admin=True))
+        user = auth_headers(add_user('user'))
+    client = application.test_client()
+    
+    # 先缓存默认布局（10列）下的座位位图，修改布局后不能继续使用
+    assert client.get(f'/api/screenings/{screening_id}/seats?format=bitmap').json['cols'] == 10
+    
+    response = client.put('/api/halls/layout', headers=admin, json={
+        'theater': '小影院', 'hall': '2号厅', 'rows': 4, 'cols': 6, 'disabled': ['1-6', '3-2']
+    })
+    assert response.status_code == 200
+    response = client.post('/api/orders', headers=user, json={
+        'screening_id': screening_id, 'seats': ['2-6', '3-1', '4-5'], 'total_price': 120
+    })
+    assert response.status_code == 201
+    
+    layout = client.get('/api/halls/layout', query_string={'theater': '小影院', 'hall': '2号厅'}).json
+    seats = client.get(f'/api/screenings/{screening_id}/seats?format=bitmap').json
+    assert (seats['rows'], seats['cols']) == (layout['rows'], layout['cols']) == (4, 6)
+    assert decode(layout['disabled'], 4, 6) == {(1, 6), (3, 2)}
+    assert decode(seats['bitmap'], 4, 6) == {(2, 6), (3, 1), (4, 5)}
+    assert seats['count'] == 3
+
+
+def test_hall_change_checks_taken_seats_and_reloads_bitmap(make_app):
+    application = make_app()
+    with application.app_context():
+        screening_id = add_screening().id
+        admin = auth_headers(add_user('admin', is_admin=True))
+        user = auth_headers(add_user('user'))
+    client = application.test_client()
+    
+    assert client.put('/api/halls/layout', headers=admin, json={
+        'theater': '万达影城', 'hall': '小厅', 'rows': 4, 'cols': 6, 'disabled': ['2-3']
+    }).status_code == 200
+    order = client.post('/api/orders', headers=user, json={
+        'screening_id': screening_id, 'seats': ['2-3', '8-10'], 'total_price': 80
+    })
+    assert order.status_code == 201
+    assert client.get(f'/api/screenings/{screening_id}/seats?format=bitmap').json['cols'] == 10
+    
+    # 已占用的 2-3 在新影厅被禁用、8-10 不存在，不能换到该影厅
+    response = client.put(f'/api/screenings/{screening_id}', headers=admin, json={'hall': '小厅'})
+    assert response.status_code == 409
+    assert '2-3' in response.json['error'] and '8-10' in response.json['error']
+    assert client.get(f'/api/screenings/{screening_id}/seats?format=bitmap').json['cols'] == 10
+    
+    assert client.post(f"/api/users/current/orders/{order.json['order_id']}/cancel",
+                       headers=user).status_code == 200
+    assert client.post('/api/orders', headers=user, json={
+        'screening_id': screening_id, 'seats': ['4-5'], 'total_price': 40
+    }).status_code == 201
+    assert client.put(f'/api/screenings/{screening_id}', headers=admin, json={'hall': '小厅'}).status_code == 200
+    seats = client.get(f'/api/screenings/{screening_id}/seats?format=bitmap').json
+    assert (seats['rows'], seats['cols']) == (4, 6)
+    assert decode(seats['bitmap'], 4, 6) == {(4, 5)}
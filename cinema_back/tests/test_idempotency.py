@@ -0,0 +1,54 @@
+"""Idempotency-Key：重复请求返回第一次的响应，同一个键用于不同内容时拒绝，处理中的重复请求等待其结束"""
+import threading
+
+from conftest import add_screening, add_user, auth_headers, cinema
+from idempotency import BUSY, REPLAY, RUN, IdempotencyStore
+
+
+def test_same_key_replays_first_response(make_app):
+    application = make_app(BOOKING_CONCURRENCY=None)
+    with application.app_context():
+        screening_id = add_screening().id
+        headers = dict(auth_headers(add_user('buyer')), **{'Idempotency-Key': 'order-1'})
+    client = application.test_client()
+    body = {'screening_id': screening_id, 'seats': ['1-1'], 'total_price': 40}
+
+    first = client.post('/api/orders', headers=headers, json=body)
+    second = client.post('/api/orders', headers=headers, json=body)
+    assert first.status_code == second.status_code == 201
+    assert 'Idempotent-Replayed' not in first.headers
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_data() == first.get_data()
+    with application.app_context():
+        assert cinema.Order.query.count() == 1
+
+
+def test_same_key_with_different_body_is_rejected(make_app):
+    application = make_app(BOOKING_CONCURRENCY=None)
+    with application.app_context():
+        screening_id = add_screening().id
+        headers = dict(auth_headers(add_user('buyer')), **{'Idempotency-Key': 'order-1'})
+    client = application.test_client()
+
+    assert client.post('/api/orders', headers=headers, json={
+        'screening_id': screening_id, 'seats': ['1-1'], 'total_price': 40
+    }).status_code == 201
+    response = client.post('/api/orders', headers=headers, json={
+        'screening_id': screening_id, 'seats': ['1-2'], 'total_price': 40
+    })
+    assert response.status_code == 422
+    with application.app_context():
+        assert cinema.Order.query.count() == 1
+
+
+def test_in_flight_duplicate_waits_for_first_response():
+    store = IdempotencyStore()
+    assert store.acquire('key', 'body', timeout=1) == (RUN, None)
+    assert store.acquire('key', 'body', timeout=0) == (BUSY, None)
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(store.acquire('key', 'body', timeout=5)))
+    waiter.start()
+    store.complete('key', (201, b'{}', 'application/json'))
+    waiter.join()
+    assert results == [(REPLAY, (201, b'{}', 'application/json'))]
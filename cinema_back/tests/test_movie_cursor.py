@@ -0,0 +1,73 @@
+"""电影列表的游标：格式不正确时返回400"""
+import base64
+import json
+from datetime import date
+
+import pytest
+
+from conftest import add_screening, cinema
+
+
+def encode(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!', encode(5), encode([1]), encode([1, 2, 3]), encode(['a', 'b']),
+    encode([{'a': 1}, 1]), encode([1, True]),
+])
+def test_malformed_cursor_is_rejected(make_app, cursor):
+    application = make_app(CATALOG_CACHE_ENABLED=False)
+    with application.app_context():
+        add_screening()
+    response = application.test_client().get('/api/movies', query_string={'cursor': cursor})
+    assert response.status_code == 400
+
+
+def test_cursor_continues_listing(make_app):
+    application = make_app(CATALOG_CACHE_ENABLED=False)
+    with application.app_context():
+        for _ in range(3):
+            add_screening()
+    client = application.test_client()
+    first = client.get('/api/movies', query_string={'page_size': 2, 'sort': 'release_date'}).json
+    second = client.get('/api/movies', query_string={'page_size': 2, 'sort': 'release_date',
+                                                      'cursor': first['next_cursor']}).json
+    assert [movie['id'] for movie in first['items'] + second['items']] == [1, 2, 3]
+    assert second['next_cursor'] is None
+
+
+@pytest.mark.parametrize('sort', ['rating', '-rating', 'release_date', '-release_date'])
+def test_cursor_pages_across_null_sort_values(make_app, sort):
+    application = make_app(CATALOG_CACHE_ENABLED=False)
+    with application.app_context():
+        values = [(4.5, date(2020, 1, 1)), (None, None), (3.0, date(2021, 1, 1)), (None, None),
+                  (4.5, None), (None, date(2019, 1, 1)), (2.0, date(2021, 1, 1))]
+        for i, (rating, release_date) in enumerate(values):
+            cinema.db.session.add(cinema.Movie(title=f'电影{i}', rating=rating, release_date=release_date))
+        cinema.db.session.flush()
+        # rating 的列默认值会替换掉None，没有评分的电影用UPDATE写入NULL
+        cinema.Movie.query.filter(cinema.Movie.id.in_([i + 1 for i, (rating, _) in enumerate(values) if rating is None])) \
+            .update({'rating': None}, synchronize_session=False)
+        cinema.db.session.commit()
+    client = application.test_client()
+    
+    listed = client.get('/api/movies', query_string={'sort': sort}).json
+    ids, cursor = [], None
+    while True:
+        params = {'page_size': 2, 'sort': sort}
+        if cursor:
+            params['cursor'] = cursor
+        page = client.get('/api/movies', query_string=params).json
+        ids += [movie['id'] for movie in page['items']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+            
+    assert ids == [movie['id'] for movie in listed]
+    assert sorted(ids) == list(range(1, len(values) + 1))
+    # NULL排在最后
+    column = sort.lstrip('-')
+    with application.app_context():
+        nulls = {movie.id for movie in cinema.Movie.query.filter(getattr(cinema.Movie, column).is_(None))}
+    assert nulls and set(ids[-len(nulls):]) == nulls
@@ -0,0 +1,30 @@
+"""订单导出的状态筛选使用API中的状态名称"""
+import json
+
+from conftest import add_screening, add_user, auth_headers, cinema
+
+
+def export_statuses(client, headers, status):
+    response = client.get('/api/orders/export', headers=headers, query_string={'status': status})
+    assert response.status_code == 200
+    return sorted(json.loads(line)['status'] for line in response.get_data(as_text=True).splitlines())
+
+
+def test_export_status_filter(make_app):
+    application = make_app()
+    with application.app_context():
+        screening = add_screening()
+        user = add_user('user')
+        for status in ('pending', 'confirmed', 'confirmed', 'cancelled'):
+            cinema.db.session.add(cinema.Order(user_id=user.id, screening_id=screening.id, seats='["1-1"]',
+                                               total_price=40.0, status=status))
+        cinema.db.session.commit()
+        headers = auth_headers(add_user('admin', is_admin=True))
+    client = application.test_client()
+    
+    assert export_statuses(client, headers, 'paid') == ['confirmed', 'confirmed']
+    assert export_statuses(client, headers, 'pending,paid') == ['confirmed', 'confirmed', 'pending']
+    
+    response = client.get('/api/orders/export', headers=headers, query_string={'status': 'paid,refunded'})
+    assert response.status_code == 400
+    assert 'refunded' in response.json['error']
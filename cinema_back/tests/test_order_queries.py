@@ -0,0 +1,50 @@
+"""订单列表接口的SQL语句数不随订单数增长"""
+import json
+
+import pytest
+
+from conftest import add_screening, add_user, auth_headers, cinema, count_queries
+
+
+def add_orders(count, distinct_users):
+    """
+    count 个订单，分属不同的场次（电影），distinct_users 时还分属不同的用户，
+    使逐条加载关联对象时语句数随订单数增长；返回第一个订单的用户
+    """
+    owner = add_user('owner')
+    for i in range(count):
+        user = add_user(f'user{i}') if distinct_users and i else owner
+        screening = add_screening(hall=f'{i + 1}号厅')
+        cinema.db.session.add(cinema.Order(user_id=user.id, screening_id=screening.id, total_price=40.0,
+                                           seats=json.dumps([f'1-{i % 10 + 1}']),
+                                           status='confirmed' if i % 2 else 'pending'))
+    cinema.db.session.commit()
+    return owner
+
+
+def list_orders_queries(make_app, count, path, as_admin):
+    application = make_app()
+    with application.app_context():
+        owner = add_orders(count, distinct_users=as_admin)
+        user = add_user('admin', is_admin=True) if as_admin else owner
+        headers = auth_headers(user)
+    client = application.test_client()
+    # 先请求一次，使身份缓存等进程内缓存处于相同状态
+    client.get(path, headers=headers)
+    with count_queries(application) as queries:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return len(response.json), len(queries)
+
+
+@pytest.mark.parametrize('path, as_admin', [
+    ('/api/orders', True),
+    ('/api/users/current/orders', False),
+])
+def test_order_list_query_count_is_constant(make_app, path, as_admin):
+    single_rows, single_queries = list_orders_queries(make_app, 1, path, as_admin)
+    many_rows, many_queries = list_orders_queries(make_app, 25, path, as_admin)
+    
+    assert single_rows == 1
+    assert many_rows == 25
+    assert single_queries == many_queries
@@ -0,0 +1,26 @@
+"""座位推送连接数达到每个worker的上限后返回503，连接关闭后归还名额"""
+from conftest import add_screening
+
+
+def test_stream_cap_rejects_and_releases(make_app):
+    application = make_app(SEAT_STREAM_MAX_PER_WORKER=1, SEAT_STREAM_HEARTBEAT=1)
+    with application.app_context():
+        screening_id = add_screening().id
+    client = application.test_client()
+    path = f'/api/screenings/{screening_id}/seats/stream'
+    
+    first = client.get(path, buffered=False)
+    assert first.status_code == 200
+    assert b'event: snapshot' in next(iter(first.response))
+    
+    rejected = client.get(path)
+    assert rejected.status_code == 503
+    assert rejected.headers['Retry-After'] == '1'
+    
+    first.close()
+    second = client.get(path, buffered=False)
+    assert second.status_code == 200
+    second.close()
+    
+    # 普通座位查询不受推送连接数影响
+    assert client.get(f'/api/screenings/{screening_id}/seats').status_code == 200
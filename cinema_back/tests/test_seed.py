@@ -0,0 +1,34 @@
+"""flask seed：按影厅布局选座，座位不足时以非零状态退出"""
+from conftest import cinema
+from seed_data import theater_name
+
+
+def test_seed_uses_hall_layouts(make_app):
+    application = make_app()
+    theater = theater_name(0)
+    with application.app_context():
+        layout = cinema.SeatMap.from_seats(4, 6, disabled=[(1, 1), (2, 3), (4, 6)])
+        cinema.db.session.add(cinema.HallLayout(theater=theater, hall='1号厅', rows=4, cols=6, aisle_rows=0,
+                                                aisle_cols=0, disabled_seats=layout.disabled_bytes(), version=1))
+        cinema.db.session.commit()
+        
+    result = application.test_cli_runner().invoke(args=['seed', '--orders', '300', '--users', '20', '--movies', '5',
+                                                        '--theaters', '2', '--halls', '2', '--days', '3',
+                                                        '--start-date', '2030-01-01'])
+    assert result.exit_code == 0, result.output
+    
+    with application.app_context():
+        seats = cinema.db.session.query(cinema.Screening.theater, cinema.Screening.hall,
+                                        cinema.SeatReservation.seat_row, cinema.SeatReservation.seat_col) \
+            .join(cinema.Screening, cinema.Screening.id == cinema.SeatReservation.screening_id).all()
+        assert seats
+        assert all(cinema.hall_layout(theater, hall).is_seat(row, col) for theater, hall, row, col in seats)
+        assert any((theater, hall) == (theater_name(0), '1号厅') for theater, hall, _, _ in seats)
+
+
+def test_seed_fails_when_seats_run_out(make_app):
+    application = make_app()
+    result = application.test_cli_runner().invoke(args=['seed', '--orders', '2000', '--users', '10', '--movies', '2',
+                                                        '--theaters', '1', '--halls', '1', '--days', '1'])
+    assert result.exit_code != 0
+    assert '座位不足' in result.output
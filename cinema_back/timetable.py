@@ -0,0 +1,103 @@
+"""
+"正在上映"时间表的预计算分桶
+
+每个桶是一天（可限定影院）的全部场次，按 (放映时间, 场次ID) 排序，查询时间窗口时二分查找，不再访问数据库。
+桶在首次查询时由调用方提供的 loader 一次范围查询加载；本进程内场次的增删改直接更新已加载的桶，
+其他进程的修改在桶过期（ttl 秒）后重新加载时生效。
+"""
+import bisect
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# fragment 为场次的JSON片段（字节串）
+TimetableEntry = namedtuple('TimetableEntry', ['screening_time', 'id', 'theater', 'hall', 'movie_id', 'fragment'])
+
+
+class Bucket:
+    """不可变：增删场次时生成新的桶，查询中的请求继续使用旧的桶"""
+    __slots__ = ('entries', 'keys', 'movies', 'expires_at')
+
+    def __init__(self, entries, movies, expires_at):
+        self.entries = entries
+        self.keys = [(entry.screening_time, entry.id) for entry in entries]
+        self.movies = movies
+        self.expires_at = expires_at
+
+    def window(self, start, end):
+        """放映时间在 [start, end) 内的场次"""
+        low = bisect.bisect_left(self.keys, (start,))
+        high = bisect.bisect_left(self.keys, (end,))
+        return self.entries[low:high]
+
+    def without(self, screening_id):
+        entries = [entry for entry in self.entries if entry.id != screening_id]
+        return Bucket(entries, self.movies, self.expires_at) if len(entries) != len(self.entries) else self
+
+    def with_entry(self, entry, movie_fragment):
+        entries = list(self.entries)
+        entries.insert(bisect.bisect_left(self.keys, (entry.screening_time, entry.id)), entry)
+        movies = dict(self.movies)
+        movies[entry.movie_id] = movie_fragment
+        return Bucket(entries, movies, self.expires_at)
+
+
+class TimetableIndex:
+    """
+    按 (日期, 影院或None) 保存的桶，超过 capacity 个时淘汰最久未使用的桶
+    loader(day, theater) 返回 (按时间排序的 TimetableEntry 列表, {movie_id: 电影片段})
+    """
+
+    def __init__(self, capacity=64, ttl=60.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次修改都递增，加载期间发生修改时不保存可能已过时的桶
+        self._generation = 0
+
+    def get(self, day, theater, loader):
+        """返回 (桶, 是否命中)"""
+        key = (day, theater)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket.expires_at > time.monotonic():
+                self._buckets.move_to_end(key)
+                return bucket, True
+            generation = self._generation
+        entries, movies = loader(day, theater)
+        bucket = Bucket(entries, movies, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation == self._generation:
+                self._buckets[key] = bucket
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.capacity:
+                    self._buckets.popitem(last=False)
+        return bucket, False
+
+    def upsert(self, entry, movie_fragment):
+        """新增或修改场次：从所有桶中移除旧的记录，再加入同一天的全部影院桶和该影院的桶"""
+        day = entry.screening_time.date()
+        with self._lock:
+            self._generation += 1
+            for key, bucket in list(self._buckets.items()):
+                bucket = bucket.without(entry.id)
+                if key[0] == day and key[1] in (None, entry.theater):
+                    bucket = bucket.with_entry(entry, movie_fragment)
+                self._buckets[key] = bucket
+
+    def remove(self, screening_id):
+        with self._lock:
+            self._generation += 1
+            for key, bucket in list(self._buckets.items()):
+                self._buckets[key] = bucket.without(screening_id)
+
+    def invalidate(self, days=None):
+        """丢弃 days 中日期的桶，days 为 None 时全部丢弃"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._buckets if days is None or key[0] in days]:
+                del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
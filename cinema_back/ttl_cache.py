@@ -0,0 +1,63 @@
+"""
+带过期时间和容量上限的线程安全LRU缓存
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """超过 capacity 时淘汰最久未使用的条目，条目在写入 ttl 秒后过期"""
+
+    _missing = object()
+
+    def __init__(self, capacity=1024, ttl=30.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次失效都递增，加载期间发生失效时不缓存可能已过时的结果
+        self._generation = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """命中时直接返回；未命中时调用 loader() 加载，结果为 None 时不缓存"""
+        value = self.get(key, self._missing)
+        if value is not self._missing:
+            return value
+        generation = self._generation
+        value = loader()
+        if value is not None and generation == self._generation:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=None):
+        """删除单个条目，key 为 None 时清空"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -4,6 +4,11 @@ export const getMovies = () => {
   return api.get('/movies')
 }
 
+// 服务端搜索/筛选/分页，params: q, start_date, end_date, min_rating, sort, page, page_size, facets
+export const searchMovies = (params = {}) => {
+  return api.get('/movies', { params })
+}
+
 export const getMovieById = (id) => {
   return api.get(`/movies/${id}`)
 }
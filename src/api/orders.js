@@ -8,8 +8,10 @@ export const getOrderById = (id) => {
   return api.get(`/orders/${id}`)
 }
 
-export const createOrder = (data) => {
-  return api.post('/orders', data)
+// idempotencyKey 相同的重复提交（如连点、网络重试）只会创建一个订单
+export const createOrder = (data, idempotencyKey) => {
+  const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}
+  return api.post('/orders', data, { headers })
 }
 
 export const updateOrderStatus = async (id, status) => {
@@ -44,7 +46,10 @@ export const updateOrderStatus = async (id, status) => {
       
       try {
         console.log(`尝试使用用户${action}端点: ${endpoint}`);
-        const response = await api[method](endpoint);
+        // 同一订单只能支付/取消一次，用订单号和操作作为幂等键，重复点击时返回第一次的结果
+        const response = await api[method](endpoint, null, {
+          headers: { 'Idempotency-Key': `${backendStatus}-${id}` }
+        });
         console.log(`用户${action}成功:`, response);
         return response;
       } catch (actionError) {
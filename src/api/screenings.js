@@ -268,6 +268,17 @@ export const deleteScreening = (id) => {
   return api.delete(`/screenings/${id}`)
 }
 
+// 批量导入场次：传入场次数组或CSV文件，返回导入数量和逐行错误
+export const importScreenings = (data, { atomic = false } = {}) => {
+  const params = { atomic }
+  if (data instanceof File || data instanceof Blob) {
+    const formData = new FormData()
+    formData.append('file', data)
+    return api.post('/screenings/bulk', formData, { params })
+  }
+  return api.post('/screenings/bulk', data, { params })
+}
+
 // 获取场次已占用座位
 export const getScreeningOccupiedSeats = async (screeningId) => {
   try {
@@ -285,4 +296,70 @@ export const getScreeningOccupiedSeats = async (screeningId) => {
     console.error('获取已占用座位失败:', error)
     return [] // 返回空数组，防止页面崩溃
   }
-}
\ No newline at end of file
+}
+
+// 场次时间表（正在上映）：params: date(YYYY-MM-DD，默认今天), theater, from/to(HH:MM)
+// 返回 { date, theater, from, to, movies: [{ movie_id, movie, screenings }] }，已开场的场次不返回
+export const getTimetable = (params = {}) => {
+  return api.get('/screenings/timetable', { params })
+}
+
+// 获取影厅座位布局，不可售座位位图（base64，第 (行-1)*cols + (列-1) 位）解码为 "行-列" 集合
+// 获取失败时使用默认的 8 排 x 10 列
+export const getHallLayout = async (theater, hall) => {
+  try {
+    const layout = await api.get('/halls/layout', { params: { theater, hall } })
+    const bytes = atob(layout.disabled || '')
+    const disabled = new Set()
+    for (let index = 0; index < layout.rows * layout.cols; index++) {
+      if (bytes.charCodeAt(index >> 3) >> (index & 7) & 1) {
+        disabled.add(`${Math.floor(index / layout.cols) + 1}-${index % layout.cols + 1}`)
+      }
+    }
+    return {
+      rows: layout.rows,
+      cols: layout.cols,
+      aisleRows: new Set(layout.aisle_rows || []),
+      aisleCols: new Set(layout.aisle_cols || []),
+      disabled,
+      version: layout.version
+    }
+  } catch (error) {
+    console.error('获取影厅布局失败:', error)
+    return { rows: 8, cols: 10, aisleRows: new Set(), aisleCols: new Set(), disabled: new Set(), version: 0 }
+  }
+}
+// 订阅场次座位变化（SSE），浏览器断线重连时会自动带上最后的版本号续传
+// handlers: { onSnapshot(occupiedSeats), onChange(state, seats), onUnavailable() }
+// 服务端推送连接已满（503）等浏览器不再重连的情况下调用 onUnavailable，由调用方改为轮询
+export const subscribeScreeningSeats = (screeningId, handlers = {}) => {
+  const source = new EventSource(`${api.defaults.baseURL}/screenings/${screeningId}/seats/stream`)
+
+  source.addEventListener('snapshot', event => {
+    const data = JSON.parse(event.data)
+    handlers.onSnapshot && handlers.onSnapshot(data.occupied_seats || [])
+  })
+
+  source.addEventListener('seats', event => {
+    const data = JSON.parse(event.data)
+    handlers.onChange && handlers.onChange(data.state, data.seats || [])
+  })
+
+  // 服务端无法续传时要求重新订阅以获取完整快照
+  source.addEventListener('reset', () => {
+    source.close()
+    const next = subscribeScreeningSeats(screeningId, handlers)
+    source.close = () => next.close()
+  })
+
+  source.onerror = (error) => {
+    if (source.readyState === EventSource.CLOSED) {
+      console.warn('座位推送不可用，改为轮询:', error)
+      handlers.onUnavailable && handlers.onUnavailable()
+      return
+    }
+    console.warn('座位推送连接中断，浏览器将自动重连:', error)
+  }
+
+  return source
+}
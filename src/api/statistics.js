@@ -0,0 +1,6 @@
+import api from './config'
+
+// 获取后台统计数据（服务端基于汇总表聚合），可选按日期范围筛选
+export const getStatistics = (params = {}) => {
+  return api.get('/admin/statistics', { params })
+}
@@ -210,7 +210,7 @@ export default {
         
         console.log('创建订单，处理后的数据:', formattedData)
         // 创建订单并获取返回的订单ID
-        const result = await createOrder(formattedData)
+        const result = await createOrder(formattedData, orderData.idempotencyKey)
         
         if (result && result.order_id) {
           console.log('订单创建成功，ID:', result.order_id)